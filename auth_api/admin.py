@@ -52,3 +52,11 @@ class DailyWellnessAdmin(admin.ModelAdmin):
     ]
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
     date_hierarchy = 'date'
+
+from .models import WellnessRollup
+
+@admin.register(WellnessRollup)
+class WellnessRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'period', 'period_start', 'days_recorded', 'first_date', 'last_date']
+    list_filter = ['period']
+    search_fields = ['user__email']
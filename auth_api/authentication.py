@@ -0,0 +1,93 @@
+"""
+JWT authentication without a users-table query per request.
+
+CachedJWTAuthentication is the default authenticator: it loads the user
+like simplejwt's JWTAuthentication but keeps it in a small per-process
+cache for JWT_USER_CACHE_TTL seconds (0 disables it). Saving or deleting
+a user evicts it from this process's cache (auth_api.signals); other
+processes may serve the old state until the TTL runs out.
+
+With JWT_TOKEN_USER_MODE on, views using TokenUserAuthMixin authenticate
+safe (read-only) requests from the access token claims alone (see
+auth_api.tokens). request.user is then a WellnessTokenUser with only an
+id and the state claims, so those views filter with user_id=.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import USER_STATE_CLAIMS
+
+USER_CACHE_MAX_ENTRIES = 10_000
+
+_user_cache = {}  # user id -> (expiry on the monotonic clock, user)
+_user_cache_lock = threading.Lock()
+
+
+def evict_cached_user(user_id):
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        ttl = getattr(settings, 'JWT_USER_CACHE_TTL', 0)
+        if not ttl:
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        now = time.monotonic()
+        entry = _user_cache.get(user_id)
+        if entry is None or entry[0] <= now:
+            user = super().get_user(validated_token)
+            with _user_cache_lock:
+                if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+                    _user_cache.clear()
+                _user_cache[user_id] = (now + ttl, user)
+            entry = (None, user)
+        # Each request gets its own copy so changes made while handling it stay private
+        return copy.copy(entry[1])
+
+
+class WellnessTokenUser(TokenUser):
+    """A user built from access token claims; has no profile fields and no database row"""
+
+    @property
+    def is_active(self):
+        return self.token.get('is_active', True)
+
+
+class TokenUserAuthentication(JWTStatelessUserAuthentication):
+    """Authenticate from the token claims; tokens issued without them fall through to the next authenticator"""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None:
+            return None
+        user, validated_token = result
+        if not all(claim in validated_token for claim in USER_STATE_CLAIMS):
+            return None
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return result
+
+    def get_user(self, validated_token):
+        return WellnessTokenUser(validated_token)
+
+
+class TokenUserAuthMixin:
+    """Views whose safe methods only need request.user.id (enabled by JWT_TOKEN_USER_MODE)"""
+
+    def get_authenticators(self):
+        authenticators = super().get_authenticators()
+        if getattr(settings, 'JWT_TOKEN_USER_MODE', False) and self.request.method in SAFE_METHODS:
+            return [TokenUserAuthentication(), *authenticators]
+        return authenticators
@@ -0,0 +1,116 @@
+"""
+Django-cache helpers for per-user wellness data.
+
+Every cached entry is keyed on a per-user version counter that the
+DailyWellness write hooks (auth_api.signals) bump, so a write makes all
+of that user's cached dashboards and data bounds unreachable at once.
+"""
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Min
+from rest_framework.response import Response
+
+from .models import DailyWellness
+
+BOUNDS_CACHE_TIMEOUT = 60 * 60  # 1 hour
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24  # 1 day
+
+HITS_KEY = 'wellness:response:hits'
+MISSES_KEY = 'wellness:response:misses'
+
+
+def get_version(name):
+    """Current value of a named version counter"""
+    key = f'version:{name}'
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a lost counter can never reuse an old version
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Move a named version counter forward, orphaning entries keyed on it"""
+    key = f'version:{name}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_wellness_version(user_id):
+    """Current data version of a user's wellness rows"""
+    return get_version(f'wellness:{user_id}')
+
+
+def bump_wellness_version(user_id):
+    """Invalidate everything cached for the user"""
+    bump_version(f'wellness:{user_id}')
+
+
+def wellness_etag(prefix, params=()):
+    """etag_func for django.views.decorators.http.condition based on the user's data version"""
+    def etag_func(request, *args, **kwargs):
+        values = ':'.join(request.query_params.get(param, '') for param in params)
+        return f'{prefix}-{request.user.id}-{get_wellness_version(request.user.id)}-{values}'
+    return etag_func
+
+
+def get_wellness_bounds(user_id):
+    """Day count and first/last record dates of a user's wellness data"""
+    key = f'wellness:bounds:{user_id}:{get_wellness_version(user_id)}'
+    bounds = cache.get(key)
+    if bounds is None:
+        bounds = DailyWellness.objects.filter(user_id=user_id).aggregate(
+            days_recorded=Count('id'),
+            first_record=Min('date'),
+            last_record=Max('date')
+        )
+        cache.set(key, bounds, BOUNDS_CACHE_TIMEOUT)
+    return bounds
+
+
+def increment_counter(key, delta=1):
+    """Add to a never-expiring counter in the cache"""
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def get_response_cache_stats():
+    """Hit/miss counters of the per-user response cache"""
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+    }
+
+
+def cache_user_response(prefix, params=()):
+    """
+    Cache a view method's 200 responses per user, keyed on the user's
+    data version and the given query parameters.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            user_id = request.user.id
+            values = ':'.join(request.query_params.get(param, '') for param in params)
+            key = f'wellness:response:{prefix}:{user_id}:{get_wellness_version(user_id)}:{values}'
+
+            data = cache.get(key)
+            if data is not None:
+                increment_counter(HITS_KEY)
+                return Response(data)
+
+            increment_counter(MISSES_KEY)
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, RESPONSE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from PASSWORD_HASH_ITERATIONS.
+
+    It keeps the 'pbkdf2_sha256' algorithm name, so existing hashes verify
+    unchanged, and must_update() flags any hash made with another count,
+    which login re-hashes on success. Django's own PBKDF2PasswordHasher must
+    not be listed in PASSWORD_HASHERS alongside it (same algorithm name).
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', PBKDF2PasswordHasher.iterations)
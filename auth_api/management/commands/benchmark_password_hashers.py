@@ -0,0 +1,76 @@
+import math
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+from auth_api.hashers import TunablePBKDF2PasswordHasher
+
+
+class Command(BaseCommand):
+    help = (
+        'Time each configured password hasher on this machine and suggest the work factor '
+        'that hashes one password in about --target-ms milliseconds.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target-ms',
+            type=float,
+            default=250,
+            help='Wanted time for one hash, in milliseconds (one login pays it once)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Hashes per measurement (the fastest one is used)',
+        )
+
+    def handle(self, *args, **options):
+        target_ms = options['target_ms']
+        repeat = options['repeat']
+
+        for position, hasher in enumerate(get_hashers()):
+            label = f"{hasher.algorithm} ({type(hasher).__module__}.{type(hasher).__name__})"
+            try:
+                elapsed_ms = self.time_hash(hasher, repeat)
+            except ValueError as e:
+                # Optional libraries (argon2-cffi, bcrypt) that are not installed
+                self.stdout.write(self.style.WARNING(f"{label}: skipped ({e})"))
+                continue
+
+            preferred = ' [preferred]' if position == 0 else ''
+            self.stdout.write(f"{label}{preferred}: {elapsed_ms:.1f} ms per hash")
+            suggestion = self.suggest(hasher, elapsed_ms, target_ms)
+            if suggestion:
+                self.stdout.write(f"    {suggestion}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Current PASSWORD_HASH_ITERATIONS={getattr(settings, 'PASSWORD_HASH_ITERATIONS', 'unset')}. "
+            'Existing hashes are upgraded on the next successful login after a change.'
+        ))
+
+    def time_hash(self, hasher, repeat):
+        salt = hasher.salt()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hasher.encode('benchmark-password', salt)
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    def suggest(self, hasher, elapsed_ms, target_ms):
+        """Work factor for the target latency, for hashers with a linear or log2 cost knob"""
+        if hasattr(hasher, 'iterations'):
+            iterations = max(10_000, int(round(hasher.iterations * target_ms / elapsed_ms, -4)))
+            if isinstance(hasher, TunablePBKDF2PasswordHasher):
+                return f"for ~{target_ms:.0f} ms set PASSWORD_HASH_ITERATIONS={iterations} (now {hasher.iterations})"
+            return f"iterations for ~{target_ms:.0f} ms: {iterations:,} (now {hasher.iterations:,})"
+        if hasattr(hasher, 'rounds'):
+            rounds = max(4, min(31, hasher.rounds + round(math.log2(target_ms / elapsed_ms))))
+            return f"rounds for ~{target_ms:.0f} ms: {rounds} (now {hasher.rounds})"
+        if hasattr(hasher, 'work_factor'):
+            work_factor = 2 ** max(1, round(math.log2(hasher.work_factor * target_ms / elapsed_ms)))
+            return f"work_factor for ~{target_ms:.0f} ms: {work_factor} (now {hasher.work_factor})"
+        return None
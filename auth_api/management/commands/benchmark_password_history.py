@@ -0,0 +1,73 @@
+import time
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from auth_api.models import CustomUser, PasswordHistory
+from auth_api.passwords import history_depth, is_in_password_history
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the password reuse check against growing password histories: checking every '
+        'stored hash (the old behaviour) versus the bounded, threaded check. Runs in a '
+        'transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1,5,20,50',
+            help='Comma separated history lengths to measure',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per measurement (the best one is reported)',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        repeat = options['repeat']
+        # Every history row gets the same hash: checking it costs the same as distinct
+        # ones and the setup hashes once instead of once per row
+        old_hash = make_password('an-old-password')
+
+        self.stdout.write(f"PASSWORD_HISTORY_DEPTH={history_depth()}, best of {repeat}, non-matching password")
+        self.stdout.write(f"{'history':>8} {'all rows (ms)':>14} {'bounded (ms)':>13}")
+        try:
+            with transaction.atomic():
+                user = CustomUser.objects.create_user(
+                    username='password-benchmark', email='password-benchmark@example.invalid',
+                    password=None, first_name='Password', last_name='Benchmark'
+                )
+                stored = 0
+                for size in sorted(sizes):
+                    PasswordHistory.objects.bulk_create(
+                        [PasswordHistory(user=user, password=old_hash) for _ in range(size - stored)]
+                    )
+                    stored = size
+                    unbounded = self.best_of(repeat, lambda: any(
+                        check_password('a-new-password', encoded)
+                        for encoded in PasswordHistory.objects.filter(user=user).values_list('password', flat=True)
+                    ))
+                    bounded = self.best_of(repeat, lambda: is_in_password_history(user, 'a-new-password'))
+                    self.stdout.write(f"{size:>8} {unbounded:>14.1f} {bounded:>13.1f}")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished (no data was kept)'))
+
+    def best_of(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
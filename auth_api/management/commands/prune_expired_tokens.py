@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding refresh tokens and their blacklist entries in small '
+        'batches, each in its own short transaction. Meant to run from cron, e.g. hourly.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tokens deleted per transaction',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.0,
+            help='Seconds to pause between batches to leave room for other writers',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the expired tokens',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Fixed cutoff: tokens expiring while the command runs wait for the next run
+        cutoff = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lte=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+            self.stdout.write(
+                f"{expired.count()} expired outstanding tokens, "
+                f"{BlacklistedToken.objects.filter(token__expires_at__lte=cutoff).count()} of them blacklisted"
+            )
+            return
+
+        deleted_tokens = deleted_blacklisted = 0
+        while True:
+            with transaction.atomic():
+                ids = list(expired.order_by('expires_at').values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                # Delete the blacklist rows first so the token delete has no cascade to collect
+                deleted_blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                deleted_tokens += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            self.stdout.write(f"Deleted {deleted_tokens} tokens so far")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted_tokens} expired outstanding tokens ({deleted_blacklisted} blacklisted)"
+        ))
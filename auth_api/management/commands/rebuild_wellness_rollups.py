@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from auth_api.models import DailyWellness, WellnessRollup
+from auth_api.rollups import rebuild_user_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the weekly, monthly and all-time wellness rollups from DailyWellness rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Only rebuild rollups for this user id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+
+        if user_ids is None:
+            # Drop rollups of users who no longer have any wellness data
+            WellnessRollup.objects.exclude(
+                user_id__in=DailyWellness.objects.values('user_id')
+            ).delete()
+            user_ids = DailyWellness.objects.values_list('user_id', flat=True).distinct().order_by('user_id')
+
+        total_users = 0
+        total_rollups = 0
+        for user_id in user_ids:
+            created = rebuild_user_rollups(user_id)
+            total_users += 1
+            total_rollups += created
+            self.stdout.write(f"Rebuilt {created} rollups for user {user_id}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {total_rollups} rollups for {total_users} users")
+        )
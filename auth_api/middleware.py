@@ -1,8 +1,22 @@
 
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .authentication import WellnessTokenUser
+from .tokens import activity_hour
+
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+_recently_tracked = {}  # token user id -> hour their activity was last written by this process
 
 class UserActivityMiddleware:
     """Middleware to track user activity"""
@@ -15,6 +29,10 @@ class UserActivityMiddleware:
         
         # Update last activity for authenticated users
         if request.user.is_authenticated and not request.user.is_data_anonymized:
+            if isinstance(request.user, WellnessTokenUser):
+                self._track_token_user(request.user)
+                return response
+
             # Only update if last activity was more than 1 hour ago to reduce DB writes
             one_hour_ago = timezone.now() - timezone.timedelta(hours=1)
             if request.user.last_activity < one_hour_ago:
@@ -22,3 +40,84 @@ class UserActivityMiddleware:
         
         return response
 
+    def _track_token_user(self, user):
+        """Token users carry the hour of their last activity; refresh it with one UPDATE by id"""
+        now = timezone.now()
+        current_hour = activity_hour(now)
+        if user.last_activity_hour >= current_hour - 1 or _recently_tracked.get(user.id) == current_hour:
+            return
+        User.objects.filter(
+            id=user.id, last_activity__lt=now - timezone.timedelta(hours=1)
+        ).update(last_activity=now)
+        # The claim stays stale until the next token; don't repeat the UPDATE this hour
+        if len(_recently_tracked) >= 10_000:
+            _recently_tracked.clear()
+        _recently_tracked[user.id] = current_hour
+
+
+class QueryDebugMiddleware:
+    """
+    Log the number and duration of the SQL queries run by a request.
+
+    Requests are instrumented when they carry the QUERY_DEBUG['HEADER']
+    header (only honoured when ALLOW_HEADER is set) or are picked by
+    SAMPLE_RATE. With both off the middleware removes itself at startup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = getattr(settings, 'QUERY_DEBUG', {})
+        self.allow_header = config.get('ALLOW_HEADER', False)
+        self.header = 'HTTP_' + config.get('HEADER', 'X-Debug-Queries').upper().replace('-', '_')
+        self.sample_rate = config.get('SAMPLE_RATE', 0.0)
+        self.slow_query_ms = config.get('SLOW_QUERY_MS', 100)
+        if not self.allow_header and not self.sample_rate:
+            raise MiddlewareNotUsed
+
+    def _should_instrument(self, request):
+        if self.allow_header and request.META.get(self.header):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self._should_instrument(request):
+            return self.get_response(request)
+
+        stats = {'count': 0, 'total_ms': 0.0, 'slowest_ms': 0.0, 'slow': []}
+
+        def record(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                stats['count'] += 1
+                stats['total_ms'] += elapsed_ms
+                stats['slowest_ms'] = max(stats['slowest_ms'], elapsed_ms)
+                if elapsed_ms >= self.slow_query_ms:
+                    stats['slow'].append({'ms': round(elapsed_ms, 2), 'sql': sql[:500]})
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record))
+            response = self.get_response(request)
+        request_ms = (time.perf_counter() - start) * 1000
+
+        summary = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats['count'],
+            'query_ms': round(stats['total_ms'], 2),
+            'slowest_query_ms': round(stats['slowest_ms'], 2),
+            'request_ms': round(request_ms, 2),
+            'slow_queries': stats['slow'],
+        }
+        logger.info(
+            f"{request.method} {request.path}: {stats['count']} queries in "
+            f"{summary['query_ms']}ms (request {summary['request_ms']}ms)",
+            extra={'query_debug': summary},
+        )
+        response['X-Query-Count'] = str(stats['count'])
+        return response
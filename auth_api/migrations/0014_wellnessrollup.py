@@ -0,0 +1,82 @@
+# Generated by Django 5.2 on 2026-10-18 10:00
+
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+ROLLUP_METRICS = ('kcal', 'protein', 'carbs', 'fats', 'sugar', 'time_slept', 'water_intake')
+
+
+def backfill_rollups(apps, schema_editor):
+    DailyWellness = apps.get_model('auth_api', 'DailyWellness')
+    WellnessRollup = apps.get_model('auth_api', 'WellnessRollup')
+
+    aggregates = {'days_recorded': Count('id'), 'first_date': Min('date'), 'last_date': Max('date')}
+    for metric in ROLLUP_METRICS:
+        aggregates[f'{metric}_sum'] = Sum(metric)
+        aggregates[f'{metric}_min'] = Min(metric)
+        aggregates[f'{metric}_max'] = Max(metric)
+
+    rollups = []
+    for period, trunc in (('week', TruncWeek), ('month', TruncMonth), ('all', None)):
+        rows = DailyWellness.objects.all()
+        if trunc:
+            rows = rows.annotate(bucket=trunc('date'))
+            grouped = rows.values('user_id', 'bucket').annotate(**aggregates).order_by()
+        else:
+            grouped = rows.values('user_id').annotate(**aggregates).order_by()
+        for values in grouped:
+            period_start = values.pop('bucket', datetime.date.min)
+            rollups.append(WellnessRollup(period=period, period_start=period_start, **values))
+    WellnessRollup.objects.bulk_create(rollups, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0013_alter_dailynutrition_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WellnessRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month'), ('all', 'All Time')], max_length=5)),
+                ('period_start', models.DateField(help_text='Monday of the week, first day of the month, or date.min for all time')),
+                ('days_recorded', models.PositiveIntegerField(default=0)),
+                ('first_date', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('kcal_sum', models.FloatField(default=0.0)),
+                ('kcal_min', models.FloatField(blank=True, null=True)),
+                ('kcal_max', models.FloatField(blank=True, null=True)),
+                ('protein_sum', models.FloatField(default=0.0)),
+                ('protein_min', models.FloatField(blank=True, null=True)),
+                ('protein_max', models.FloatField(blank=True, null=True)),
+                ('carbs_sum', models.FloatField(default=0.0)),
+                ('carbs_min', models.FloatField(blank=True, null=True)),
+                ('carbs_max', models.FloatField(blank=True, null=True)),
+                ('fats_sum', models.FloatField(default=0.0)),
+                ('fats_min', models.FloatField(blank=True, null=True)),
+                ('fats_max', models.FloatField(blank=True, null=True)),
+                ('sugar_sum', models.FloatField(default=0.0)),
+                ('sugar_min', models.FloatField(blank=True, null=True)),
+                ('sugar_max', models.FloatField(blank=True, null=True)),
+                ('time_slept_sum', models.FloatField(default=0.0)),
+                ('time_slept_min', models.FloatField(blank=True, null=True)),
+                ('time_slept_max', models.FloatField(blank=True, null=True)),
+                ('water_intake_sum', models.FloatField(default=0.0)),
+                ('water_intake_min', models.FloatField(blank=True, null=True)),
+                ('water_intake_max', models.FloatField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wellness_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'period', 'period_start')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0014_wellnessrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailywellness',
+            index=models.Index(fields=['user', '-date'], name='wellness_user_date_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailywellness',
+            index=models.Index(fields=['user', 'date', 'kcal', 'protein', 'carbs', 'fats', 'sugar', 'time_slept', 'water_intake'], name='wellness_user_metrics_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 10:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0015_dailywellness_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='passwordhistory',
+            index=models.Index(fields=['user', '-created_at'], name='password_history_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index simplejwt's outstanding tokens by expiry for prune_expired_tokens.
+    The table belongs to a third-party app, hence plain SQL.
+    """
+
+    dependencies = [
+        ('auth_api', '0016_password_history_recent_idx'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS outstanding_token_expires_idx '
+                'ON token_blacklist_outstandingtoken (expires_at)',
+            reverse_sql='DROP INDEX IF EXISTS outstanding_token_expires_idx',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 10:49
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_time_slept_days(apps, schema_editor):
+    # Until now every recorded day had time_slept
+    WellnessRollup = apps.get_model('auth_api', 'WellnessRollup')
+    WellnessRollup.objects.update(time_slept_days=F('days_recorded'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0017_outstanding_token_expires_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wellnessrollup',
+            name='time_slept_days',
+            field=models.PositiveIntegerField(default=0, help_text='Days with time_slept recorded'),
+        ),
+        migrations.AlterField(
+            model_name='dailywellness',
+            name='time_slept',
+            field=models.FloatField(blank=True, help_text='Hours slept (empty when not recorded, e.g. a day started by meal logging)', null=True),
+        ),
+        migrations.RunPython(backfill_time_slept_days, migrations.RunPython.noop),
+    ]
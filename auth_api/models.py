@@ -138,6 +138,10 @@ class PasswordHistory(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Newest N entries per user (bounded history check and pruning)
+            models.Index(fields=['user', '-created_at'], name='password_history_recent_idx'),
+        ]
 
 
 class DailyWellness(models.Model):
@@ -152,7 +156,11 @@ class DailyWellness(models.Model):
     sugar = models.FloatField(default=0.0, help_text="grams")
 
     # Sleep
-    time_slept = models.FloatField(help_text="Hours slept")
+    time_slept = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Hours slept (empty when not recorded, e.g. a day started by meal logging)"
+    )
 
     # Hydration
     water_intake = models.FloatField(help_text="Liters")
@@ -172,6 +180,80 @@ class DailyWellness(models.Model):
 
     class Meta:
         unique_together = ['user', 'date']
+        indexes = [
+            # List view: filter by user, newest first
+            models.Index(fields=['user', '-date'], name='wellness_user_date_desc_idx'),
+            # Dashboard range aggregates: answered from the index alone
+            models.Index(
+                fields=['user', 'date', 'kcal', 'protein', 'carbs', 'fats', 'sugar', 'time_slept', 'water_intake'],
+                name='wellness_user_metrics_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Wellness for {self.user.email} on {self.date}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the loaded values so writes can be diffed against them (see auth_api.rollups)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class WellnessRollup(models.Model):
+    """Pre-aggregated DailyWellness totals per user and period, maintained on write"""
+    PERIOD_CHOICES = [
+        ('week', 'Week'),
+        ('month', 'Month'),
+        ('all', 'All Time'),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='wellness_rollups')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField(help_text="Monday of the week, first day of the month, or date.min for all time")
+
+    days_recorded = models.PositiveIntegerField(default=0)
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+
+    # Nutrition
+    kcal_sum = models.FloatField(default=0.0)
+    kcal_min = models.FloatField(null=True, blank=True)
+    kcal_max = models.FloatField(null=True, blank=True)
+    protein_sum = models.FloatField(default=0.0)
+    protein_min = models.FloatField(null=True, blank=True)
+    protein_max = models.FloatField(null=True, blank=True)
+    carbs_sum = models.FloatField(default=0.0)
+    carbs_min = models.FloatField(null=True, blank=True)
+    carbs_max = models.FloatField(null=True, blank=True)
+    fats_sum = models.FloatField(default=0.0)
+    fats_min = models.FloatField(null=True, blank=True)
+    fats_max = models.FloatField(null=True, blank=True)
+    sugar_sum = models.FloatField(default=0.0)
+    sugar_min = models.FloatField(null=True, blank=True)
+    sugar_max = models.FloatField(null=True, blank=True)
+
+    # Sleep
+    time_slept_days = models.PositiveIntegerField(default=0, help_text="Days with time_slept recorded")
+    time_slept_sum = models.FloatField(default=0.0)
+    time_slept_min = models.FloatField(null=True, blank=True)
+    time_slept_max = models.FloatField(null=True, blank=True)
+
+    # Hydration
+    water_intake_sum = models.FloatField(default=0.0)
+    water_intake_min = models.FloatField(null=True, blank=True)
+    water_intake_max = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['user', 'period', 'period_start']
+
+    def __str__(self):
+        return f"{self.get_period_display()} rollup for {self.user_id} from {self.period_start}"
+
+    def average(self, metric):
+        """Average of a metric over the days it was recorded on"""
+        days = getattr(self, f'{metric}_days', self.days_recorded)
+        if not days:
+            return 0
+        return getattr(self, f'{metric}_sum') / days
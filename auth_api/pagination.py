@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class DailyWellnessCursorPagination(CursorPagination):
+    """Keyset pagination on date (unique per user), newest first"""
+    ordering = '-date'
+    page_size = 31
+    page_size_query_param = 'page_size'
+    max_page_size = 366
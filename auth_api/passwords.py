@@ -0,0 +1,190 @@
+"""
+Password changes and history checks.
+
+change_password() is the one place a password is changed. Every check
+costs a full hash, so it runs as few as possible: a verified current
+password that differs from the new one as a string cannot share its
+hash, each stored hash is checked at most once (the current hash is
+usually also the newest history entry), and the new password is hashed
+once, for both the user and the history row. Salted hashes cannot be
+compared to a precomputed hash, so each distinct stored hash still
+needs one check.
+
+Only the newest PASSWORD_HISTORY_DEPTH hashes are kept (older rows are
+pruned whenever one is recorded), so a change costs at most that many
+checks however long the account has existed. They run in a small shared
+thread pool (PBKDF2 releases the GIL) and stop at the first match.
+
+verify_password() is the login check: when the stored hash was made with
+other hasher parameters (see auth_api.hashers) it is re-hashed on success,
+so the hashing cost can be retuned without forcing password resets.
+
+Hashing time per operation is counted in the cache for MetricsView.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.db import transaction
+
+from .caching import increment_counter
+from .models import PasswordHistory
+
+DEFAULT_HISTORY_DEPTH = 5
+DEFAULT_CHECK_WORKERS = 4
+
+HASH_OPERATIONS = ['verify_login', 'rehash', 'verify_current', 'check_history', 'hash_new']
+
+_executor = None
+
+
+class PasswordChangeError(Exception):
+    """A rejected password change; `code` is one of the constants below"""
+    INCORRECT_CURRENT = 'incorrect_current'
+    SAME_AS_CURRENT = 'same_as_current'
+    REUSED = 'reused'
+
+    MESSAGES = {
+        INCORRECT_CURRENT: 'Current password is incorrect',
+        SAME_AS_CURRENT: 'New password cannot be the same as the old password',
+        REUSED: 'You cannot reuse a previously used password',
+    }
+
+    def __init__(self, code):
+        self.code = code
+        self.message = self.MESSAGES[code]
+        super().__init__(self.message)
+
+
+@contextmanager
+def hash_timer(operation, hashes=1):
+    """Count the calls, hashes and time spent in a hashing operation"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if hashes:
+            elapsed_us = int((time.perf_counter() - start) * 1_000_000)
+            increment_counter(f'passwords:{operation}:calls')
+            increment_counter(f'passwords:{operation}:hashes', hashes)
+            increment_counter(f'passwords:{operation}:us', elapsed_us)
+
+
+def get_password_hash_stats():
+    """Calls, hashes and hashing time per password operation"""
+    keys = [f'passwords:{operation}:{field}' for operation in HASH_OPERATIONS for field in ('calls', 'hashes', 'us')]
+    values = cache.get_many(keys)
+    stats = {}
+    for operation in HASH_OPERATIONS:
+        calls = values.get(f'passwords:{operation}:calls', 0)
+        hashes = values.get(f'passwords:{operation}:hashes', 0)
+        total_ms = values.get(f'passwords:{operation}:us', 0) / 1000
+        stats[operation] = {
+            'calls': calls,
+            'hashes': hashes,
+            'total_ms': round(total_ms, 1),
+            'avg_ms_per_hash': round(total_ms / hashes, 1) if hashes else None,
+        }
+    return stats
+
+
+def history_depth():
+    return getattr(settings, 'PASSWORD_HISTORY_DEPTH', DEFAULT_HISTORY_DEPTH)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'PASSWORD_CHECK_WORKERS', DEFAULT_CHECK_WORKERS),
+            thread_name_prefix='password-check',
+        )
+    return _executor
+
+
+def first_match(raw_password, encoded_passwords):
+    """The hash raw_password matches, or None; remaining checks are cancelled on a match"""
+    encoded_passwords = list(encoded_passwords)
+    if len(encoded_passwords) <= 1:
+        return next((encoded for encoded in encoded_passwords if check_password(raw_password, encoded)), None)
+
+    futures = {_get_executor().submit(check_password, raw_password, encoded): encoded for encoded in encoded_passwords}
+    try:
+        for future in as_completed(futures):
+            if future.result():
+                return futures[future]
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def recent_password_hashes(user, depth=None):
+    depth = history_depth() if depth is None else depth
+    return list(PasswordHistory.objects.filter(user=user).values_list('password', flat=True)[:depth])
+
+
+def is_in_password_history(user, raw_password):
+    """True if raw_password is one of the user's last PASSWORD_HISTORY_DEPTH passwords"""
+    return first_match(raw_password, recent_password_hashes(user)) is not None
+
+
+def record_password_history(user):
+    """Store the user's current hash and drop entries beyond the configured depth"""
+    PasswordHistory.objects.create(user=user, password=user.password)
+    keep = PasswordHistory.objects.filter(user=user).values_list('id', flat=True)[:history_depth()]
+    PasswordHistory.objects.filter(user=user).exclude(id__in=list(keep)).delete()
+
+
+def verify_password(user, raw_password):
+    """Check a login password, upgrading the stored hash if the hasher parameters changed"""
+    def rehash(raw):
+        previous = user.password
+        with hash_timer('rehash'):
+            user.set_password(raw)
+        with transaction.atomic():
+            user.save(update_fields=['password'])
+            # Keep the newest history entry equal to the current hash (one check, not two)
+            PasswordHistory.objects.filter(user=user, password=previous).update(password=user.password)
+
+    with hash_timer('verify_login'):
+        return check_password(raw_password, user.password, setter=rehash)
+
+
+def change_password(user, new_password, current_password=None):
+    """
+    Set a new password after checking it against the current one and the history.
+
+    Pass current_password when the user must prove they know it (it is
+    verified first). Raises PasswordChangeError when the change is refused.
+    """
+    verified_current = False
+    if current_password is not None:
+        with hash_timer('verify_current'):
+            verified_current = check_password(current_password, user.password)
+        if not verified_current:
+            raise PasswordChangeError(PasswordChangeError.INCORRECT_CURRENT)
+        if current_password == new_password:
+            raise PasswordChangeError(PasswordChangeError.SAME_AS_CURRENT)
+
+    # A verified, textually different current password already rules out the current hash
+    candidates = [] if verified_current else [user.password]
+    for encoded in recent_password_hashes(user):
+        if encoded not in candidates and not (verified_current and encoded == user.password):
+            candidates.append(encoded)
+
+    with hash_timer('check_history', len(candidates)):
+        matched = first_match(new_password, candidates)
+    if matched is not None:
+        if matched == user.password:
+            raise PasswordChangeError(PasswordChangeError.SAME_AS_CURRENT)
+        raise PasswordChangeError(PasswordChangeError.REUSED)
+
+    with hash_timer('hash_new'):
+        user.set_password(new_password)
+    with transaction.atomic():
+        user.save(update_fields=['password'])
+        record_password_history(user)
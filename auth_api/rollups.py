@@ -0,0 +1,264 @@
+"""
+Incremental maintenance of WellnessRollup rows.
+
+Every DailyWellness write is applied to the week, month and all-time
+buckets it belongs to. Sums and counts are adjusted in place; only when
+a removed or replaced value held a bucket's min/max (or first/last date)
+and its replacement does not take over is that bucket re-aggregated from
+the raw rows.
+"""
+from calendar import monthrange
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+
+from .models import DailyWellness, WellnessRollup
+
+ROLLUP_METRICS = ('kcal', 'protein', 'carbs', 'fats', 'sugar', 'time_slept', 'water_intake')
+# Metrics a day may leave empty; the days they were recorded on are counted in <metric>_days
+OPTIONAL_METRICS = ('time_slept',)
+ALL_TIME_START = date.min
+
+
+def bucket_keys(day):
+    """(period, period_start) of every rollup bucket containing a day"""
+    return [
+        ('week', day - timedelta(days=day.weekday())),
+        ('month', day.replace(day=1)),
+        ('all', ALL_TIME_START),
+    ]
+
+
+def bucket_range(period, period_start):
+    """Inclusive date range covered by a bucket, or None for all time"""
+    if period == 'week':
+        return period_start, period_start + timedelta(days=6)
+    if period == 'month':
+        return period_start, period_start.replace(day=monthrange(period_start.year, period_start.month)[1])
+    return None
+
+
+def rollup_aggregates():
+    """Aggregate expressions producing WellnessRollup field values from DailyWellness rows"""
+    aggregates = {
+        'days_recorded': Count('id'),
+        'first_date': Min('date'),
+        'last_date': Max('date'),
+    }
+    for metric in ROLLUP_METRICS:
+        aggregates[f'{metric}_sum'] = Sum(metric)
+        aggregates[f'{metric}_min'] = Min(metric)
+        aggregates[f'{metric}_max'] = Max(metric)
+    for metric in OPTIONAL_METRICS:
+        aggregates[f'{metric}_sum'] = Coalesce(Sum(metric), 0.0)  # no recorded day: 0, not NULL
+        aggregates[f'{metric}_days'] = Count(metric)
+    return aggregates
+
+
+def snapshot(instance):
+    """
+    Date and metric values of a DailyWellness instance as currently stored.
+
+    Taken from the values it was loaded with; when those are missing or
+    partial (built with an explicit pk, loaded with .only()/.defer()) the
+    stored row is read instead. None if there is no stored row.
+    """
+    fields = ('date', *ROLLUP_METRICS)
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    if all(field in loaded for field in fields):
+        return {field: loaded[field] for field in fields}
+    if instance.pk is None:
+        return None
+    return DailyWellness.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def rebuild_bucket(user_id, period, period_start, rollup=None):
+    """Re-aggregate one bucket from the raw DailyWellness rows"""
+    rows = DailyWellness.objects.filter(user_id=user_id)
+    date_range = bucket_range(period, period_start)
+    if date_range:
+        rows = rows.filter(date__range=date_range)
+    values = rows.aggregate(**rollup_aggregates())
+
+    if rollup is None:
+        rollup = WellnessRollup.objects.filter(user_id=user_id, period=period, period_start=period_start).first()
+
+    if not values['days_recorded']:
+        if rollup is not None:
+            rollup.delete()
+        return None
+
+    if rollup is None:
+        rollup = WellnessRollup(user_id=user_id, period=period, period_start=period_start)
+    for field, value in values.items():
+        setattr(rollup, field, value)
+    rollup.save()
+    return rollup
+
+
+def rebuild_user_rollups(user_id):
+    """Replace all of a user's rollups using one grouped query per period"""
+    rows = DailyWellness.objects.filter(user_id=user_id)
+    rollups = []
+    for period, trunc in (('week', TruncWeek), ('month', TruncMonth)):
+        grouped = rows.annotate(bucket=trunc('date')).values('bucket').annotate(**rollup_aggregates()).order_by('bucket')
+        for values in grouped:
+            period_start = values.pop('bucket')
+            rollups.append(WellnessRollup(user_id=user_id, period=period, period_start=period_start, **values))
+
+    overall = rows.aggregate(**rollup_aggregates())
+    if overall['days_recorded']:
+        rollups.append(WellnessRollup(user_id=user_id, period='all', period_start=ALL_TIME_START, **overall))
+
+    with transaction.atomic():
+        WellnessRollup.objects.filter(user_id=user_id).delete()
+        WellnessRollup.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def _loses_extreme(rollup, removed, added):
+    """
+    Whether taking `removed` out of the bucket (and putting `added` in its
+    place, if any) may leave a min/max or first/last date that no remaining
+    row holds, so the bucket has to be re-aggregated
+    """
+    if added is None or added['date'] != removed['date']:
+        if removed['date'] == rollup.first_date and (added is None or added['date'] > removed['date']):
+            return True
+        if removed['date'] == rollup.last_date and (added is None or added['date'] < removed['date']):
+            return True
+    for metric in ROLLUP_METRICS:
+        value = removed[metric]
+        replacement = added[metric] if added else None
+        if value is None:
+            continue
+        current_min = getattr(rollup, f'{metric}_min')
+        current_max = getattr(rollup, f'{metric}_max')
+        if current_min is None or current_max is None:
+            return True  # the bucket does not know this value: out of step
+        if value <= current_min and (replacement is None or replacement > value):
+            return True
+        if value >= current_max and (replacement is None or replacement < value):
+            return True
+    return False
+
+
+def _add(rollup, values):
+    rollup.days_recorded += 1
+    rollup.first_date = min(rollup.first_date or values['date'], values['date'])
+    rollup.last_date = max(rollup.last_date or values['date'], values['date'])
+    for metric in ROLLUP_METRICS:
+        value = values[metric]
+        if value is None:
+            continue
+        if metric in OPTIONAL_METRICS:
+            setattr(rollup, f'{metric}_days', getattr(rollup, f'{metric}_days') + 1)
+        current_min = getattr(rollup, f'{metric}_min')
+        current_max = getattr(rollup, f'{metric}_max')
+        setattr(rollup, f'{metric}_sum', getattr(rollup, f'{metric}_sum') + value)
+        setattr(rollup, f'{metric}_min', value if current_min is None else min(current_min, value))
+        setattr(rollup, f'{metric}_max', value if current_max is None else max(current_max, value))
+
+
+def _subtract(rollup, values):
+    rollup.days_recorded -= 1
+    for metric in ROLLUP_METRICS:
+        if values[metric] is None:
+            continue
+        if metric in OPTIONAL_METRICS:
+            setattr(rollup, f'{metric}_days', getattr(rollup, f'{metric}_days') - 1)
+        setattr(rollup, f'{metric}_sum', getattr(rollup, f'{metric}_sum') - values[metric])
+
+
+def record_change(user_id, old=None, new=None):
+    """
+    Apply a DailyWellness write to the user's rollups.
+    `old` is the snapshot before the write (None on create) and `new`
+    the snapshot after it (None on delete).
+    """
+    old_keys = bucket_keys(old['date']) if old else []
+    new_keys = bucket_keys(new['date']) if new else []
+    keys = list(dict.fromkeys(old_keys + new_keys))
+
+    with transaction.atomic():
+        existing = {
+            (rollup.period, rollup.period_start): rollup
+            for rollup in WellnessRollup.objects.select_for_update().filter(
+                user_id=user_id,
+                period_start__in=[period_start for period, period_start in keys]
+            )
+        }
+        for key in keys:
+            removed = old if key in old_keys else None
+            added = new if key in new_keys else None
+            rollup = existing.get(key)
+
+            if rollup is None:
+                # Never create buckets for pure removals (e.g. while the user is being deleted)
+                if added:
+                    rebuild_bucket(user_id, *key)
+                continue
+
+            if removed:
+                if rollup.days_recorded <= 1 and not added:
+                    rollup.delete()
+                    continue
+                if _loses_extreme(rollup, removed, added):
+                    rebuild_bucket(user_id, *key, rollup=rollup)
+                    continue
+                _subtract(rollup, removed)
+            if added:
+                _add(rollup, added)
+            rollup.save()
+
+
+def rebuild_buckets_for_dates(user_id, dates):
+    """
+    Re-aggregate every bucket touched by a set of dates (used after bulk
+    writes, which skip the post_save hooks). Runs one grouped query per
+    period whatever the number of dates.
+    """
+    keys = set(key for day in dates for key in bucket_keys(day))
+    if not keys:
+        return
+
+    rows = DailyWellness.objects.filter(user_id=user_id)
+    fresh = {}
+    for period, trunc in (('week', TruncWeek), ('month', TruncMonth)):
+        starts = [period_start for key_period, period_start in keys if key_period == period]
+        range_start = min(starts)
+        range_end = bucket_range(period, max(starts))[1]
+        grouped = rows.filter(date__range=[range_start, range_end]).annotate(
+            bucket=trunc('date')
+        ).values('bucket').annotate(**rollup_aggregates()).order_by()
+        for values in grouped:
+            period_start = values.pop('bucket')
+            if (period, period_start) in keys:
+                fresh[(period, period_start)] = values
+    overall = rows.aggregate(**rollup_aggregates())
+    if overall['days_recorded']:
+        fresh[('all', ALL_TIME_START)] = overall
+
+    field_names = list(rollup_aggregates())
+    with transaction.atomic():
+        existing = {
+            (rollup.period, rollup.period_start): rollup
+            for rollup in WellnessRollup.objects.select_for_update().filter(
+                user_id=user_id,
+                period_start__in=[period_start for period, period_start in keys]
+            )
+            if (rollup.period, rollup.period_start) in keys
+        }
+        to_update, to_create = [], []
+        for key, values in fresh.items():
+            rollup = existing.pop(key, None) or WellnessRollup(user_id=user_id, period=key[0], period_start=key[1])
+            for field, value in values.items():
+                setattr(rollup, field, value)
+            (to_update if rollup.pk else to_create).append(rollup)
+
+        WellnessRollup.objects.bulk_update(to_update, field_names)
+        WellnessRollup.objects.bulk_create(to_create)
+        # Buckets left in `existing` no longer have any rows
+        WellnessRollup.objects.filter(pk__in=[rollup.pk for rollup in existing.values()]).delete()
@@ -4,6 +4,7 @@ from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import check_password
+from .passwords import verify_password
 
 User = get_user_model()
 
@@ -68,7 +69,7 @@ class LoginSerializer(serializers.Serializer):
                 {"non_field_errors": ["Invalid email or password."]}
             )
         
-        if not user.check_password(password):
+        if not verify_password(user, password):
             raise serializers.ValidationError(
                 {"non_field_errors": ["Invalid email or password."]}
             )
@@ -112,15 +113,15 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return instance
     
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .tokens import WellnessRefreshToken
 
 class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = WellnessRefreshToken
+
     def validate(self, attrs):
         data = super().validate(attrs)
-        # Return both access and new refresh (if rotation)
-        if self.context.get("request"):
-            refresh_token = self.context["request"].data.get("refresh")
-            if refresh_token:
-                data["refresh"] = refresh_token
+        # Return both access and refresh: the rotated one, or the same one without rotation
+        data.setdefault("refresh", attrs["refresh"])
         return data
 
 
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import CustomUser, DailyWellness
+from .authentication import evict_cached_user
+from . import caching, rollups
+
+
+def deleted_with_user(origin):
+    """Whether a delete signal comes from a user delete cascading to the row"""
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, CustomUser)
+    return isinstance(origin, CustomUser)
+
+
+@receiver(pre_save, sender=DailyWellness)
+@receiver(pre_delete, sender=DailyWellness)
+def remember_stored_wellness(sender, instance, raw=False, origin=None, **kwargs):
+    """Capture the row's stored values while they can still be read, for the rollup update"""
+    if raw or deleted_with_user(origin):
+        return
+    instance._stored_snapshot = rollups.snapshot(instance)
+
+
+@receiver(post_save, sender=DailyWellness)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep the user's wellness rollups in step with the saved day"""
+    if raw:
+        return
+    old = None if created else instance._stored_snapshot
+    # to_python: values passed to create()/save() may still be strings
+    new = {
+        field: instance._meta.get_field(field).to_python(getattr(instance, field))
+        for field in ('date', *rollups.ROLLUP_METRICS)
+    }
+    rollups.record_change(instance.user_id, old=old, new=new)
+    instance._loaded_values = {**getattr(instance, '_loaded_values', {}), **new}
+
+
+@receiver(post_delete, sender=DailyWellness)
+def update_rollups_on_delete(sender, instance, origin=None, **kwargs):
+    """Remove the deleted day from the user's wellness rollups"""
+    if deleted_with_user(origin):
+        # The cascade deletes the rollups too
+        return
+    rollups.record_change(instance.user_id, old=instance._stored_snapshot)
+
+
+@receiver(post_save, sender=DailyWellness)
+@receiver(post_delete, sender=DailyWellness)
+def invalidate_wellness_cache(sender, instance, origin=None, **kwargs):
+    """Bump the user's data version now and again once the write is committed"""
+    if deleted_with_user(origin):
+        # Bumped once for the whole user by invalidate_deleted_user_cache
+        return
+    user_id = instance.user_id
+    caching.bump_wellness_version(user_id)
+    transaction.on_commit(lambda: caching.bump_wellness_version(user_id))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def evict_authenticated_user(sender, instance, **kwargs):
+    """Drop the user from this process's authentication cache"""
+    evict_cached_user(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def invalidate_deleted_user_cache(sender, instance, **kwargs):
+    """Orphan everything cached for a deleted user in one version bump"""
+    user_id = instance.pk
+    caching.bump_wellness_version(user_id)
+    transaction.on_commit(lambda: caching.bump_wellness_version(user_id))
@@ -1,3 +1,268 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+from django.db import connection
+from django.contrib.auth.tokens import default_token_generator
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from users.views import reset_password
+
+from .models import CustomUser, DailyWellness, PasswordHistory, WellnessRollup
+from .rollups import rebuild_user_rollups, rollup_aggregates
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN output checked here is SQLite specific')
+class DailyWellnessIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='indexed', email='indexed@example.com', password='pw',
+            first_name='Index', last_name='Test'
+        )
+        start = date(2025, 1, 1)
+        DailyWellness.objects.bulk_create([
+            DailyWellness(
+                user=cls.user, date=start + timedelta(days=offset), kcal=2000,
+                protein=100, carbs=250, fats=70, sugar=30, time_slept=7.5, water_intake=2.0
+            )
+            for offset in range(60)
+        ])
+
+    def test_list_query_uses_descending_user_date_index(self):
+        plan = DailyWellness.objects.filter(user=self.user).order_by('-date').explain()
+
+        self.assertIn('USING INDEX wellness_user_date_desc_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_dashboard_range_aggregate_uses_covering_index(self):
+        plan = DailyWellness.objects.filter(
+            user=self.user,
+            date__range=[date(2025, 1, 1), date(2025, 1, 31)]
+        ).values('user').annotate(**rollup_aggregates()).order_by().explain()
+
+        self.assertIn('USING COVERING INDEX wellness_user_metrics_idx', plan)
+        self.assertNotIn('SCAN auth_api_dailywellness', plan)
+
+    def test_all_time_aggregate_is_an_index_search(self):
+        plan = DailyWellness.objects.filter(user=self.user).values('user').annotate(**rollup_aggregates()).order_by().explain()
+
+        self.assertIn('USING COVERING INDEX', plan)
+        self.assertNotIn('SCAN auth_api_dailywellness', plan)
+
+
+
+class IncrementalRollupTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='rollup', email='rollup@example.com', password='pw',
+            first_name='Roll', last_name='Up'
+        )
+        start = date(2025, 3, 3)
+        for offset in range(10):
+            DailyWellness.objects.create(
+                user=self.user, date=start + timedelta(days=offset), kcal=1800 + offset * 50,
+                protein=90 + offset, carbs=200, fats=60, sugar=20, time_slept=7 + offset / 10, water_intake=2.0
+            )
+
+    def rollups(self):
+        return {
+            (rollup.period, rollup.period_start): {
+                field: round(value, 6) if isinstance(value, float) else value
+                for field, value in vars(rollup).items()
+                if field in rollup_aggregates()
+            }
+            for rollup in WellnessRollup.objects.filter(user=self.user)
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.rollups()
+        rebuild_user_rollups(self.user.id)
+        self.assertEqual(incremental, self.rollups())
+
+    def test_create(self):
+        DailyWellness.objects.create(
+            user=self.user, date=date(2025, 3, 20), kcal=2500,
+            protein=50, carbs=300, fats=80, sugar=10, time_slept=6, water_intake=3.0
+        )
+        self.assertMatchesRebuild()
+
+    def test_update_replacing_extremes(self):
+        lowest = DailyWellness.objects.get(user=self.user, date=date(2025, 3, 3))
+        lowest.kcal = 2000
+        lowest.time_slept = 5
+        lowest.save()
+        self.assertMatchesRebuild()
+
+    def test_date_move_within_and_across_buckets(self):
+        row = DailyWellness.objects.get(user=self.user, date=date(2025, 3, 3))
+        row.date = date(2025, 3, 1)
+        row.save()
+        self.assertMatchesRebuild()
+
+        row.date = date(2025, 3, 28)
+        row.save()
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        DailyWellness.objects.get(user=self.user, date=date(2025, 3, 12)).delete()
+        DailyWellness.objects.get(user=self.user, date=date(2025, 3, 5)).delete()
+        self.assertMatchesRebuild()
+
+    def test_update_inside_the_extremes_skips_reaggregation(self):
+        row = DailyWellness.objects.get(user=self.user, date=date(2025, 3, 7))
+        row.kcal += 10
+        row.protein += 0.5
+        # Row update, savepoint, one rollup read, three bucket updates, release
+        with self.assertNumQueries(7):
+            row.save()
+        self.assertMatchesRebuild()
+
+    def test_saves_without_fully_loaded_values_use_the_stored_row(self):
+        stored = DailyWellness.objects.get(user=self.user, date=date(2025, 3, 5))
+        rebuilt = DailyWellness(
+            pk=stored.pk, user=self.user, date=date(2025, 3, 20), kcal=2600,
+            protein=60, carbs=100, fats=40, sugar=10, time_slept=5, water_intake=1.0
+        )
+        rebuilt.save()
+        self.assertMatchesRebuild()
+
+        partial = DailyWellness.objects.only('id', 'user', 'kcal').get(user=self.user, date=date(2025, 3, 6))
+        partial.kcal = 1000
+        partial.save()
+        self.assertMatchesRebuild()
+
+        deferred = DailyWellness.objects.defer('protein').get(user=self.user, date=date(2025, 3, 7))
+        deferred.delete()
+        self.assertMatchesRebuild()
+
+    def test_bulk_upsert_keeps_rollups_and_dashboard_etag_current(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        dashboard = '/api/wellness/dashboard/?period=month&date=2025-03-10'
+        before = client.get(dashboard)
+
+        day = {'protein': 80, 'carbs': 150, 'fats': 50, 'sugar': 5, 'time_slept': 9, 'water_intake': 3.5}
+        response = client.post('/api/wellness/bulk/', [
+            {'date': '2025-03-03', 'kcal': 1500, **day},  # lowers the existing minimum
+            {'date': '2025-03-31', 'kcal': 3000, **day},  # new week
+            {'date': '2025-04-01', 'kcal': 2100, **day},  # new month
+        ], format='json')
+        self.assertEqual((response.json()['created'], response.json()['updated']), (2, 1))
+        self.assertMatchesRebuild()
+
+        after = client.get(dashboard, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertEqual(after.content, client.get(dashboard).content)
+        self.assertNotEqual(after.content, before.content)
+
+    def test_user_delete_skips_per_row_rollup_updates(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.user.delete()
+
+        self.assertFalse(WellnessRollup.objects.exists())
+        # Only the cascade's bulk delete, no per-row bucket updates
+        rollup_queries = [query['sql'] for query in queries.captured_queries if 'auth_api_wellnessrollup' in query['sql']]
+        self.assertEqual(len(rollup_queries), 1)
+
+
+class TokenRefreshRotationTests(TestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(
+            username='rotating', email='rotating@example.com', password='Pass-word1',
+            first_name='Token', last_name='Test'
+        )
+        self.client = APIClient()
+        self.refresh = self.client.post(
+            '/api/login/', {'email': 'rotating@example.com', 'password': 'Pass-word1'}, format='json'
+        ).json()['refresh']
+
+    def test_rotated_token_can_be_refreshed_again(self):
+        first = self.client.post('/api/token/refresh/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(first.status_code, 200)
+        self.assertNotEqual(first.json()['refresh'], self.refresh)
+
+        second = self.client.post('/api/token/refresh/', {'refresh': first.json()['refresh']}, format='json')
+        self.assertEqual(second.status_code, 200)
+
+    def test_replayed_token_is_rejected(self):
+        self.client.post('/api/token/refresh/', {'refresh': self.refresh}, format='json')
+
+        response = self.client.post('/api/token/refresh/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000, PASSWORD_HISTORY_DEPTH=2)
+class PasswordChangeTests(TestCase):
+    """change_password through each of its call sites"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='changer', email='changer@example.com', password='Original-pass-1',
+            first_name='Pass', last_name='Word'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def change_in_settings(self, current, new):
+        return self.client.patch('/api/settings/update/', {
+            'current_password': current, 'new_password': new, 'confirm_password': new,
+        }, format='json')
+
+    def change_in_users(self, current, new):
+        # Called directly: the auth router's users/<pk>/ route shadows /api/users/reset-password/
+        request = APIRequestFactory().post('/api/users/reset-password/', {
+            'current_password': current, 'new_password': new,
+        }, format='json')
+        force_authenticate(request, user=self.user)
+        return reset_password(request)
+
+    def reset(self, new):
+        return self.client.post('/api/reset-password/', {
+            'uid': urlsafe_base64_encode(force_bytes(self.user.pk)),
+            'token': default_token_generator.make_token(self.user),
+            'new_password': new,
+        }, format='json')
+
+    def test_wrong_current_password(self):
+        response = self.change_in_settings('Wrong-pass-1', 'Brand-new-pass-2')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('current_password', response.json())
+
+    def test_new_password_same_as_current(self):
+        self.assertEqual(self.change_in_users('Original-pass-1', 'Original-pass-1').status_code, 400)
+        self.assertEqual(self.reset('Original-pass-1').json()['message'],
+                         'New password cannot be the same as the old password')
+
+    def test_reused_password_from_history(self):
+        self.assertEqual(self.change_in_settings('Original-pass-1', 'Second-pass-2').status_code, 200)
+        self.assertEqual(self.change_in_users('Second-pass-2', 'Third-pass-3').status_code, 200)
+        self.user.refresh_from_db()
+
+        response = self.reset('Second-pass-2')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'You cannot reuse a previously used password')
+
+    def test_history_beyond_depth_is_accepted_and_pruned(self):
+        for current, new in (('Original-pass-1', 'Second-pass-2'), ('Second-pass-2', 'Third-pass-3'),
+                             ('Third-pass-3', 'Fourth-pass-4')):
+            self.assertEqual(self.change_in_users(current, new).status_code, 200)
+        self.user.refresh_from_db()
+
+        self.assertEqual(self.reset('Second-pass-2').status_code, 200)
+        self.assertEqual(PasswordHistory.objects.filter(user=self.user).count(), 2)
+
+    def test_new_hash_is_stored_once_for_user_and_history(self):
+        self.change_in_settings('Original-pass-1', 'Second-pass-2')
+        self.user.refresh_from_db()
+
+        newest = PasswordHistory.objects.filter(user=self.user).first()
+        self.assertEqual(newest.password, self.user.password)
+        self.assertTrue(self.user.check_password('Second-pass-2'))
@@ -0,0 +1,99 @@
+"""
+JWTs carrying the user state that token-user authentication needs.
+
+Access tokens get is_active, is_data_anonymized and the hour of the
+user's last activity, so safe requests can be authenticated from the
+token alone (auth_api.authentication.TokenUserAuthentication). Claims
+are read from the database whenever an access token is issued (login,
+registration, password reset and refresh), so they are never older
+than ACCESS_TOKEN_LIFETIME plus the time since that read.
+
+Refresh tokens also remember, per process, the jtis they have seen on
+the blacklist. Blacklisting is permanent, so a remembered jti is refused
+without a query. Only positive answers can be kept locally: another
+process may blacklist a token at any time, so "not blacklisted" always
+comes from the database.
+"""
+import threading
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_STATE_CLAIMS = ['is_active', 'is_data_anonymized', 'last_activity_hour']
+
+BLACKLIST_CACHE_SIZE = 10_000
+
+_blacklisted_jtis = OrderedDict()  # LRU of jtis known to be blacklisted
+_blacklist_lock = threading.Lock()
+
+
+def remember_blacklisted(jti):
+    with _blacklist_lock:
+        _blacklisted_jtis[jti] = True
+        _blacklisted_jtis.move_to_end(jti)
+        if len(_blacklisted_jtis) > BLACKLIST_CACHE_SIZE:
+            _blacklisted_jtis.popitem(last=False)
+
+
+def is_known_blacklisted(jti):
+    with _blacklist_lock:
+        if jti in _blacklisted_jtis:
+            _blacklisted_jtis.move_to_end(jti)
+            return True
+    return False
+
+
+def activity_hour(moment):
+    """Hours since the epoch: the granularity activity tracking works at"""
+    return int(moment.timestamp() // 3600)
+
+
+def user_state_claims(user):
+    return {
+        'is_active': user.is_active,
+        'is_data_anonymized': user.is_data_anonymized,
+        'last_activity_hour': activity_hour(user.last_activity),
+    }
+
+
+class WellnessRefreshToken(RefreshToken):
+    # Refresh tokens live for days; their access tokens get claims read at issue time
+    no_copy_claims = (*RefreshToken.no_copy_claims, *USER_STATE_CLAIMS)
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if is_known_blacklisted(jti):
+            raise TokenError(_("Token is blacklisted"))
+        try:
+            super().check_blacklist()
+        except TokenError:
+            remember_blacklisted(jti)
+            raise
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        remember_blacklisted(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token._user = user  # saves the lookup when the access token is issued right away
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = getattr(self, '_user', None)
+        if user is None:
+            user = get_user_model().objects.filter(
+                **{api_settings.USER_ID_FIELD: self.payload.get(api_settings.USER_ID_CLAIM)}
+            ).only('is_active', 'is_data_anonymized', 'last_activity').first()
+        if user is not None:
+            for claim, value in user_state_claims(user).items():
+                access[claim] = value
+        return access
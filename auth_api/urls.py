@@ -1,5 +1,5 @@
 from django.urls import path, include
-from .views import RegisterView, LoginView, LogoutView, PasswordResetRequestView, PasswordResetConfirmView, UserProfileAPIView, DeleteAccountView, DataRetentionLog, DataRetentionStatusView, ExtendRetentionView, CustomTokenRefreshView
+from .views import RegisterView, LoginView, LogoutView, PasswordResetRequestView, PasswordResetConfirmView, UserProfileAPIView, DeleteAccountView, DataRetentionLog, DataRetentionStatusView, ExtendRetentionView, CustomTokenRefreshView, MetricsView
 from rest_framework.routers import DefaultRouter
 router = DefaultRouter()
 from . import views
@@ -26,6 +26,7 @@ urlpatterns = [
     path('user/delete-account/', DeleteAccountView.as_view(), name='delete-account'),
     path('retention-status/', DataRetentionStatusView.as_view(), name='retention-status'),
     path('extend-retention/', ExtendRetentionView.as_view(), name='extend-retention'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 
 ]
 
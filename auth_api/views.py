@@ -2,6 +2,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import WellnessRefreshToken
+from .authentication import TokenUserAuthMixin
 from .serializers import RegisterSerializer, LoginSerializer
 from django.contrib.auth import get_user_model
 import logging
@@ -20,7 +22,7 @@ class RegisterView(APIView):
                 logger.info(f"User created successfully: {user.email}")
                 
                 # Auto-login after registration by creating tokens
-                refresh = RefreshToken.for_user(user)
+                refresh = WellnessRefreshToken.for_user(user)
                 
                 response_data = {
                     "message": "Registration successful!",
@@ -70,7 +72,7 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
+            refresh = WellnessRefreshToken.for_user(user)
             
             response_data = {
                 'message': 'Login successful',
@@ -107,7 +109,7 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data.get('refresh')
-            token = RefreshToken(refresh_token)
+            token = WellnessRefreshToken(refresh_token)
             token.blacklist()  # Blacklist the refresh token
             return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
         except TokenError as e:
@@ -181,8 +183,7 @@ from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.hashers import check_password
 from django.utils.encoding import force_str
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import PasswordHistory
-from django.contrib.auth.hashers import check_password, make_password
+from .passwords import change_password, PasswordChangeError
 
 class PasswordResetConfirmView(APIView):
     def post(self, request):
@@ -202,21 +203,12 @@ class PasswordResetConfirmView(APIView):
         if not default_token_generator.check_token(user, token):
             return Response({'message': 'Token is invalid or expired'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if check_password(new_password, user.password):
-            return Response({'message': 'New password cannot be the same as the old password'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # ✅ Check against password history
-        previous_passwords = PasswordHistory.objects.filter(user=user).values_list('password', flat=True)
-        for old_hashed in previous_passwords:
-            if check_password(new_password, old_hashed):
-                return Response({'message': 'You cannot reuse a previously used password'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Save password + history
-        user.set_password(new_password)
-        user.save()
-        PasswordHistory.objects.create(user=user, password=user.password)
+        try:
+            change_password(user, new_password)
+        except PasswordChangeError as e:
+            return Response({'message': e.message}, status=status.HTTP_400_BAD_REQUEST)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = WellnessRefreshToken.for_user(user)
         return Response({
             'message': 'Password reset successful',
             'access': str(refresh.access_token),
@@ -297,7 +289,15 @@ from django.db.models import Q
 from django.utils import timezone
 from datetime import datetime, timedelta, date
 from collections import defaultdict
-from .models import CustomUser, DailyWellness
+from .models import CustomUser, DailyWellness, WellnessRollup
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.db import transaction
+from .passwords import get_password_hash_stats
+from .caching import get_wellness_bounds, cache_user_response, wellness_etag, bump_wellness_version
+from .rollups import rebuild_buckets_for_dates
+from .pagination import DailyWellnessCursorPagination
+from rest_framework.exceptions import ValidationError
 from .serializers import (
     CustomUserSerializer, DailyWellnessSerializer, DashboardSerializer
 )
@@ -319,24 +319,105 @@ from datetime import datetime, timedelta
 from calendar import monthrange
 import calendar
 
-class DailyWellnessViewSet(viewsets.ModelViewSet):
+class DailyWellnessViewSet(TokenUserAuthMixin, viewsets.ModelViewSet):
     serializer_class = DailyWellnessSerializer
     permission_classes = [IsAuthenticated]
     
+    pagination_class = DailyWellnessCursorPagination
+    
     def get_queryset(self):
         user = self.request.user
         date_param = self.request.query_params.get('date')
-        queryset = DailyWellness.objects.filter(user=user)
+        queryset = DailyWellness.objects.filter(user_id=user.id)
         
         if date_param:
             queryset = queryset.filter(date=date_param)
         
+        # Optional inclusive date range: ?from=YYYY-MM-DD&to=YYYY-MM-DD
+        for param, lookup in (('from', 'date__gte'), ('to', 'date__lte')):
+            value = self.request.query_params.get(param)
+            if value:
+                try:
+                    queryset = queryset.filter(**{lookup: datetime.strptime(value, '%Y-%m-%d').date()})
+                except ValueError:
+                    raise ValidationError({param: 'Invalid date format. Use YYYY-MM-DD'})
+        
         return queryset.order_by('-date')
     
+    @property
+    def paginator(self):
+        """Cursor pagination unless the client explicitly opts out with ?paginate=false"""
+        if self.request.query_params.get('paginate') == 'false':
+            return None
+        return super().paginator
+    
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # Meal logging may already have started the day: fill that row in instead of failing on (user, date)
+        with transaction.atomic():
+            serializer.instance = DailyWellness.objects.select_for_update().filter(
+                user_id=self.request.user.id, date=serializer.validated_data['date']
+            ).first()
+            serializer.save(user=self.request.user)
+    
+    BULK_MAX_ITEMS = 366
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create or update many days at once (offline sync)
+        Body: a list of DailyWellness objects; an existing day for the same
+        date is overwritten. Later items win over earlier ones with the same date.
+        """
+        if not isinstance(request.data, list):
+            return Response({'error': 'Expected a list of wellness entries'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = DailyWellnessSerializer(data=request.data, many=True, max_length=self.BULK_MAX_ITEMS)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        user = request.user
+        items_by_date = {}
+        for index, item in enumerate(serializer.validated_data):
+            items_by_date[item['date']] = (index, item)
+        
+        update_fields = [
+            field.name for field in DailyWellness._meta.concrete_fields
+            if field.name not in ('id', 'user', 'date')
+        ]
+        existing_dates = set(
+            DailyWellness.objects.filter(user=user, date__in=items_by_date.keys()).values_list('date', flat=True)
+        )
+        
+        with transaction.atomic():
+            saved = DailyWellness.objects.bulk_create(
+                [DailyWellness(user=user, **item) for index, item in items_by_date.values()],
+                update_conflicts=True,
+                unique_fields=['user', 'date'],
+                update_fields=update_fields
+            )
+            # bulk_create skips the post_save hooks, so refresh rollups and caches here
+            rebuild_buckets_for_dates(user.id, items_by_date.keys())
+            bump_wellness_version(user.id)
+            transaction.on_commit(lambda: bump_wellness_version(user.id))
+        
+        results = [
+            {'index': index, 'date': item['date'].strftime('%Y-%m-%d'), 'status': 'superseded'}
+            for index, item in enumerate(serializer.validated_data)
+        ]
+        for (index, item), wellness in zip(items_by_date.values(), saved):
+            results[index]['id'] = wellness.pk
+            results[index]['status'] = 'updated' if item['date'] in existing_dates else 'created'
+        
+        return Response({
+            'created': sum(1 for result in results if result['status'] == 'created'),
+            'updated': sum(1 for result in results if result['status'] == 'updated'),
+            'results': results
+        })
     
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=wellness_etag('dashboard', params=('period', 'date'))))
+    @cache_user_response('dashboard', params=('period', 'date'))
     def dashboard(self, request):
         """
         Get wellness data for different time periods
@@ -348,18 +429,17 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
         date_param = request.query_params.get('date')
         user = request.user
         
-        # Get user's data range
-        user_data = DailyWellness.objects.filter(user=user)
-        if not user_data.exists():
+        # Get user's data range (count + first/last record in one cached aggregate)
+        bounds = self._get_data_bounds(user)
+        if not bounds['days_recorded']:
             return Response({
                 'period': period,
                 'data': [],
                 'message': 'No wellness data available'
             })
         
-        # Get data range boundaries
-        first_record = user_data.aggregate(Min('date'))['date__min']
-        last_record = user_data.aggregate(Max('date'))['date__max']
+        first_record = bounds['first_record']
+        last_record = bounds['last_record']
         
         if period == 'day':
             return self._get_day_data(user, date_param, first_record, last_record)
@@ -372,6 +452,12 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
         else:
             return Response({'error': 'Invalid period'}, status=status.HTTP_400_BAD_REQUEST)
     
+    def _get_data_bounds(self, user):
+        """Count and date bounds of the user's data, memoized for this request"""
+        if not hasattr(self, '_data_bounds'):
+            self._data_bounds = get_wellness_bounds(user.id)
+        return self._data_bounds
+    
     def _get_day_data(self, user, date_param, first_record, last_record):
         """Get data for a specific day"""
         if not date_param:
@@ -394,7 +480,7 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
             })
         
         try:
-            wellness_data = DailyWellness.objects.get(user=user, date=target_date)
+            wellness_data = DailyWellness.objects.get(user_id=user.id, date=target_date)
             serializer = DailyWellnessSerializer(wellness_data)
             return Response({
                 'period': 'day',
@@ -430,25 +516,25 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
         actual_start = max(week_start, first_record)
         actual_end = min(week_end, last_record)
         
-        # Get data for each day in the week
+        # Load the whole week in one query, then fill in missing days in memory
+        week_records = {
+            record.date: record
+            for record in DailyWellness.objects.filter(
+                user_id=user.id,
+                date__range=[actual_start, actual_end]
+            )
+        }
+
         daily_data = []
         current_date = actual_start
-        
+
         while current_date <= actual_end:
-            try:
-                wellness_data = DailyWellness.objects.get(user=user, date=current_date)
-                serializer = DailyWellnessSerializer(wellness_data)
-                daily_data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'day_of_week': current_date.strftime('%A'),
-                    'data': serializer.data
-                })
-            except DailyWellness.DoesNotExist:
-                daily_data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'day_of_week': current_date.strftime('%A'),
-                    'data': None
-                })
+            wellness_data = week_records.get(current_date)
+            daily_data.append({
+                'date': current_date.strftime('%Y-%m-%d'),
+                'day_of_week': current_date.strftime('%A'),
+                'data': DailyWellnessSerializer(wellness_data).data if wellness_data else None
+            })
             current_date += timedelta(days=1)
         
         return Response({
@@ -480,20 +566,12 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
         actual_start = max(month_start, first_record)
         actual_end = min(month_end, last_record)
         
-        # Get aggregated data for the month
-        month_data = DailyWellness.objects.filter(
-            user=user,
-            date__range=[actual_start, actual_end]
-        ).aggregate(
-            avg_kcal=Avg('kcal'),
-            avg_protein=Avg('protein'),
-            avg_carbs=Avg('carbs'),
-            avg_fats=Avg('fats'),
-            avg_sugar=Avg('sugar'),
-            avg_time_slept=Avg('time_slept'),
-            avg_water_intake=Avg('water_intake'),
-            total_days=Count('date')
-        )
+        # Read the pre-aggregated month from the user's rollups
+        month_rollup = WellnessRollup.objects.filter(
+            user_id=user.id,
+            period='month',
+            period_start=month_start
+        ).first()
         
         return Response({
             'period': 'month',
@@ -501,18 +579,22 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
             'month_name': calendar.month_name[month],
             'period_start': actual_start.strftime('%Y-%m-%d'),
             'period_end': actual_end.strftime('%Y-%m-%d'),
-            'data': {
-                'avg_kcal': round(month_data['avg_kcal'] or 0, 1),
-                'avg_protein': round(month_data['avg_protein'] or 0, 1),
-                'avg_carbs': round(month_data['avg_carbs'] or 0, 1),
-                'avg_fats': round(month_data['avg_fats'] or 0, 1),
-                'avg_sugar': round(month_data['avg_sugar'] or 0, 1),
-                'avg_time_slept': round(month_data['avg_time_slept'] or 0, 1),
-                'avg_water_intake': round(month_data['avg_water_intake'] or 0, 1),
-                'days_recorded': month_data['total_days']
-            }
+            'data': self._rollup_averages(month_rollup)
         })
     
+    def _rollup_averages(self, rollup):
+        """Dashboard averages for a WellnessRollup (zeros when there is no data)"""
+        return {
+            'avg_kcal': round(rollup.average('kcal') if rollup else 0, 1),
+            'avg_protein': round(rollup.average('protein') if rollup else 0, 1),
+            'avg_carbs': round(rollup.average('carbs') if rollup else 0, 1),
+            'avg_fats': round(rollup.average('fats') if rollup else 0, 1),
+            'avg_sugar': round(rollup.average('sugar') if rollup else 0, 1),
+            'avg_time_slept': round(rollup.average('time_slept') if rollup else 0, 1),
+            'avg_water_intake': round(rollup.average('water_intake') if rollup else 0, 1),
+            'days_recorded': rollup.days_recorded if rollup else 0
+        }
+    
     def _get_year_data(self, user, date_param, first_record, last_record):
         """Get average data for each month of a year"""
         if date_param:
@@ -534,9 +616,16 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
         actual_start = max(year_start, first_record)
         actual_end = min(year_end, last_record)
         
-        # Get data for each month in the year
+        # Monthly rollups of the year, read in a single query
+        month_rollups = WellnessRollup.objects.filter(
+            user_id=user.id,
+            period='month',
+            period_start__range=[year_start, year_end]
+        )
+        rollups_by_month = {rollup.period_start.month: rollup for rollup in month_rollups}
+
         monthly_data = []
-        
+
         for month in range(1, 13):
             month_start = datetime(year, month, 1).date()
             last_day = monthrange(year, month)[1]
@@ -549,39 +638,21 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
             # Adjust month boundaries to user's data range
             period_start = max(month_start, actual_start)
             period_end = min(month_end, actual_end)
-            
-            month_stats = DailyWellness.objects.filter(
-                user=user,
-                date__range=[period_start, period_end]
-            ).aggregate(
-                avg_kcal=Avg('kcal'),
-                avg_protein=Avg('protein'),
-                avg_carbs=Avg('carbs'),
-                avg_fats=Avg('fats'),
-                avg_sugar=Avg('sugar'),
-                avg_time_slept=Avg('time_slept'),
-                avg_water_intake=Avg('water_intake'),
-                total_days=Count('date')
-            )
-            
-            if month_stats['total_days'] > 0:  # Only include months with data
-                monthly_data.append({
-                    'month': month,
-                    'month_name': calendar.month_name[month],
-                    'year_month': f"{year}-{month:02d}",
-                    'period_start': period_start.strftime('%Y-%m-%d'),
-                    'period_end': period_end.strftime('%Y-%m-%d'),
-                    'data': {
-                        'avg_kcal': round(month_stats['avg_kcal'] or 0, 1),
-                        'avg_protein': round(month_stats['avg_protein'] or 0, 1),
-                        'avg_carbs': round(month_stats['avg_carbs'] or 0, 1),
-                        'avg_fats': round(month_stats['avg_fats'] or 0, 1),
-                        'avg_sugar': round(month_stats['avg_sugar'] or 0, 1),
-                        'avg_time_slept': round(month_stats['avg_time_slept'] or 0, 1),
-                        'avg_water_intake': round(month_stats['avg_water_intake'] or 0, 1),
-                        'days_recorded': month_stats['total_days']
-                    }
-                })
+
+            month_entry = {
+                'month': month,
+                'month_name': calendar.month_name[month],
+                'year_month': f"{year}-{month:02d}",
+                'period_start': period_start.strftime('%Y-%m-%d'),
+                'period_end': period_end.strftime('%Y-%m-%d'),
+                'data': None  # Placeholder for months without records
+            }
+
+            month_rollup = rollups_by_month.get(month)
+            if month_rollup:
+                month_entry['data'] = self._rollup_averages(month_rollup)
+
+            monthly_data.append(month_entry)
         
         return Response({
             'period': 'year',
@@ -592,46 +663,37 @@ class DailyWellnessViewSet(viewsets.ModelViewSet):
         })
 
 # Optional: Enhanced Dashboard ViewSet for more complex analytics
-class DashboardViewSet(viewsets.ViewSet):
+class DashboardViewSet(TokenUserAuthMixin, viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
     
     @action(detail=False, methods=['get'])
+    @method_decorator(condition(etag_func=wellness_etag('summary')))
+    @cache_user_response('summary')
     def summary(self, request):
         """Get overall wellness summary statistics"""
         user = request.user
         
-        # Get overall statistics
-        overall_stats = DailyWellness.objects.filter(user=user).aggregate(
-            total_days=Count('date'),
-            avg_kcal=Avg('kcal'),
-            avg_protein=Avg('protein'),
-            avg_carbs=Avg('carbs'),
-            avg_fats=Avg('fats'),
-            avg_sugar=Avg('sugar'),
-            avg_time_slept=Avg('time_slept'),
-            avg_water_intake=Avg('water_intake'),
-            first_record=Min('date'),
-            last_record=Max('date')
-        )
+        # Read the all-time rollup instead of re-aggregating every row
+        overall = WellnessRollup.objects.filter(user_id=user.id, period='all').first()
         
-        if overall_stats['total_days'] == 0:
+        if overall is None or overall.days_recorded == 0:
             return Response({'message': 'No wellness data available'})
         
         return Response({
             'summary': {
-                'total_days_recorded': overall_stats['total_days'],
+                'total_days_recorded': overall.days_recorded,
                 'date_range': {
-                    'start': overall_stats['first_record'].strftime('%Y-%m-%d'),
-                    'end': overall_stats['last_record'].strftime('%Y-%m-%d')
+                    'start': overall.first_date.strftime('%Y-%m-%d'),
+                    'end': overall.last_date.strftime('%Y-%m-%d')
                 },
                 'averages': {
-                    'kcal': round(overall_stats['avg_kcal'] or 0, 1),
-                    'protein': round(overall_stats['avg_protein'] or 0, 1),
-                    'carbs': round(overall_stats['avg_carbs'] or 0, 1),
-                    'fats': round(overall_stats['avg_fats'] or 0, 1),
-                    'sugar': round(overall_stats['avg_sugar'] or 0, 1),
-                    'time_slept': round(overall_stats['avg_time_slept'] or 0, 1),
-                    'water_intake': round(overall_stats['avg_water_intake'] or 0, 1)
+                    'kcal': round(overall.average('kcal'), 1),
+                    'protein': round(overall.average('protein'), 1),
+                    'carbs': round(overall.average('carbs'), 1),
+                    'fats': round(overall.average('fats'), 1),
+                    'sugar': round(overall.average('sugar'), 1),
+                    'time_slept': round(overall.average('time_slept'), 1),
+                    'water_intake': round(overall.average('water_intake'), 1)
                 }
             }
         })
@@ -726,3 +788,17 @@ class ExtendRetentionView(APIView):
             'message': 'Retention period extended successfully',
             'new_last_activity': user.last_activity
         })
+
+
+from rest_framework.permissions import IsAdminUser
+from .caching import get_response_cache_stats
+
+class MetricsView(APIView):
+    """Operational counters for scraping (staff only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'dashboard_cache': get_response_cache_stats(),
+            'password_hashing': get_password_hash_stats(),
+        })
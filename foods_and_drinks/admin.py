@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Food, Drink
+from .models import Food, Drink, MealEntry
 
 admin.site.register(Food)
 admin.site.register(Drink)
+admin.site.register(MealEntry)
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class FoodsAndDrinksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'foods_and_drinks'
+
+    def ready(self):
+        from .search import ensure_search_triggers
+        post_migrate.connect(ensure_search_triggers, sender=self)
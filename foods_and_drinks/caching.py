@@ -0,0 +1,67 @@
+"""
+Caching for the food and drink catalogs.
+
+Each catalog has a version counter per owner (one for the global items,
+one per user) kept in the Django cache and bumped by the write hooks in
+foods_and_drinks.signals. List views derive their ETags from them, and
+the serialized global catalog is kept in process memory for as long as
+the global version is unchanged (bounded by a TTL).
+"""
+import time
+
+from auth_api.caching import get_version, bump_version
+
+GLOBAL_CATALOG_TTL = 5 * 60  # seconds
+
+# model name -> (global version, expiry on the monotonic clock, serialized rows)
+_global_catalog = {}
+
+
+def _version_name(model, owner_id):
+    return f"catalog:{model._meta.model_name}:{owner_id or 'global'}"
+
+
+def get_catalog_version(model, owner_id=None):
+    """Version of the global items (owner_id=None) or of one user's own items"""
+    return get_version(_version_name(model, owner_id))
+
+
+def bump_catalog_version(model, owner_id=None):
+    bump_version(_version_name(model, owner_id))
+
+
+def catalog_etag(model, params=()):
+    """
+    etag_func for django.views.decorators.http.condition on a catalog list view.
+    The listed query parameters are part of the tag, so a page or a ?fields=
+    projection never validates a cached copy of a different response.
+    """
+    def etag_func(request, *args, **kwargs):
+        tag = f'{model._meta.model_name}-list-{get_catalog_version(model)}'
+        if request.user.is_authenticated:
+            tag += f'-{request.user.id}-{get_catalog_version(model, request.user.id)}'
+        values = []
+        for param in params:
+            value = request.query_params.get(param, '')
+            if param == 'fields':
+                # Not comma-joined: If-None-Match splits on commas
+                value = '.'.join(sorted({name.strip() for name in value.split(',') if name.strip()}))
+            values.append(value)
+        return f"{tag}-{':'.join(values)}"
+    return etag_func
+
+
+def get_global_catalog(model, serializer_class):
+    """Serialized global items of a catalog, served from process memory while current"""
+    name = model._meta.model_name
+    version = get_catalog_version(model)
+    now = time.monotonic()
+
+    entry = _global_catalog.get(name)
+    if entry and entry[0] == version and entry[1] > now:
+        return entry[2]
+
+    # Serialized without a request: global items are never editable
+    rows = serializer_class(model.objects.filter(user=None).order_by('id'), many=True).data
+    _global_catalog[name] = (version, now + GLOBAL_CATALOG_TTL, rows)
+    return rows
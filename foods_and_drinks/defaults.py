@@ -0,0 +1,195 @@
+"""
+Default food and drink catalog shared by every user (user=None rows).
+"""
+import logging
+
+from .models import Food, Drink
+from .caching import bump_catalog_version
+
+logger = logging.getLogger(__name__)
+
+# Default foods with nutritional data
+DEFAULT_FOODS = [
+    {
+        'name': 'Chicken Breast',
+        'water_percentage': 65,
+        'calories_per_gram': 1.65,
+        'protein_per_gram': 0.31,
+        'carbs_per_gram': 0,
+        'fats_per_gram': 0.036,
+        'sugar_per_gram': 0.0,
+        'mass': 100
+    },
+    {
+        'name': 'Steak',
+        'water_percentage': 55,
+        'calories_per_gram': 2.5,
+        'protein_per_gram': 0.26,
+        'carbs_per_gram': 0,
+        'fats_per_gram': 0.20,
+        'sugar_per_gram': 0.0,
+        'mass': 100
+    },
+    {
+        'name': 'Brown Rice',
+        'water_percentage': 12,
+        'calories_per_gram': 1.11,
+        'protein_per_gram': 0.026,
+        'carbs_per_gram': 0.23,
+        'fats_per_gram': 0.009,
+        'sugar_per_gram': 0.01,
+        'mass': 100
+    },
+    {
+        'name': 'Broccoli',
+        'water_percentage': 89,
+        'calories_per_gram': 0.34,
+        'protein_per_gram': 0.028,
+        'carbs_per_gram': 0.07,
+        'fats_per_gram': 0.004,
+        'sugar_per_gram': 0.015,
+        'mass': 100
+    },
+    {
+        'name': 'Apple',
+        'water_percentage': 85,
+        'calories_per_gram': 0.52,
+        'protein_per_gram': 0.003,
+        'carbs_per_gram': 0.14,
+        'fats_per_gram': 0.002,
+        'sugar_per_gram': 0.10,
+        'mass': 100
+    },
+    {
+        'name': 'Salmon',
+        'water_percentage': 62,
+        'calories_per_gram': 2.08,
+        'protein_per_gram': 0.20,
+        'carbs_per_gram': 0,
+        'fats_per_gram': 0.13,
+        'sugar_per_gram': 0.0,
+        'mass': 100
+    },
+    {
+        'name': 'Whole Wheat Bread',
+        'water_percentage': 38,
+        'calories_per_gram': 2.66,
+        'protein_per_gram': 0.13,
+        'carbs_per_gram': 0.44,
+        'fats_per_gram': 0.035,
+        'sugar_per_gram': 0.05,
+        'mass': 100
+    },
+    {
+        'name': 'Greek Yogurt',
+        'water_percentage': 85,
+        'calories_per_gram': 0.59,
+        'protein_per_gram': 0.10,
+        'carbs_per_gram': 0.036,
+        'fats_per_gram': 0.005,
+        'sugar_per_gram': 0.035,
+        'mass': 100
+    },
+    {
+        'name': 'Almonds',
+        'water_percentage': 4,
+        'calories_per_gram': 5.76,
+        'protein_per_gram': 0.21,
+        'carbs_per_gram': 0.22,
+        'fats_per_gram': 0.49,
+        'sugar_per_gram': 0.04,
+        'mass': 100
+    },
+]
+
+
+# Default drinks with nutritional data
+DEFAULT_DRINKS = [
+    {
+        'name': 'Water',
+        'calories_per_ml': 0,
+        'sugar_per_ml': 0,
+        'protein_per_ml': 0,
+        'carbs_per_ml': 0,
+        'fats_per_ml': 0,
+        'volume': 250
+    },
+    {
+        'name': 'Milk',
+        'calories_per_ml': 0.64,
+        'sugar_per_ml': 0.05,
+        'protein_per_ml': 0.033,
+        'carbs_per_ml': 0.048,
+        'fats_per_ml': 0.035,
+        'volume': 250
+    },
+    {
+        'name': 'Orange Juice',
+        'calories_per_ml': 0.45,
+        'sugar_per_ml': 0.08,
+        'protein_per_ml': 0.007,
+        'carbs_per_ml': 0.11,
+        'fats_per_ml': 0.001,
+        'volume': 250
+    },
+    {
+        'name': 'Protein Shake',
+        'calories_per_ml': 0.48,
+        'sugar_per_ml': 0.02,
+        'protein_per_ml': 0.08,
+        'carbs_per_ml': 0.05,
+        'fats_per_ml': 0.01,
+        'volume': 250
+    },
+    {
+        'name': 'Green Tea',
+        'calories_per_ml': 0.008,
+        'sugar_per_ml': 0,
+        'protein_per_ml': 0,
+        'carbs_per_ml': 0,
+        'fats_per_ml': 0,
+        'volume': 250
+    },
+    {
+        'name': 'Black Coffee',
+        'calories_per_ml': 0.02,
+        'sugar_per_ml': 0,
+        'protein_per_ml': 0,
+        'carbs_per_ml': 0,
+        'fats_per_ml': 0,
+        'volume': 250
+    },
+    {
+        'name': 'Sports Drink',
+        'calories_per_ml': 0.20,
+        'sugar_per_ml': 0.05,
+        'protein_per_ml': 0,
+        'carbs_per_ml': 0.06,
+        'fats_per_ml': 0,
+        'volume': 250
+    },
+    {
+        'name': 'Coconut Water',
+        'calories_per_ml': 0.184,
+        'sugar_per_ml': 0.03,
+        'protein_per_ml': 0.002,
+        'carbs_per_ml': 0.045,
+        'fats_per_ml': 0.001,
+        'volume': 250
+    }
+]
+
+
+def ensure_global_defaults():
+    """Create any missing global default foods and drinks; returns how many were created"""
+    created = 0
+    for model, defaults in ((Food, DEFAULT_FOODS), (Drink, DEFAULT_DRINKS)):
+        existing = set(model.objects.filter(user=None).values_list('name', flat=True))
+        missing = [model(user=None, **item) for item in defaults if item['name'] not in existing]
+        if missing:
+            model.objects.bulk_create(missing)
+            # bulk_create skips the post_save hooks that normally bump this
+            bump_catalog_version(model)
+            logger.info(f"Created {len(missing)} global {model.__name__.lower()} items")
+            created += len(missing)
+    return created
@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from foods_and_drinks.models import Food, Drink, MealEntry
+from foods_and_drinks.defaults import DEFAULT_FOODS, DEFAULT_DRINKS, ensure_global_defaults
+from foods_and_drinks.caching import bump_catalog_version
+
+
+class Command(BaseCommand):
+    help = (
+        'Replace per-user copies of the default foods and drinks with the shared global items. '
+        'Untouched copies are deleted; edited copies are linked to their global item so they replace it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be done without actually doing it',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows deleted or updated per statement',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+        else:
+            ensure_global_defaults()
+
+        for model, defaults in ((Food, DEFAULT_FOODS), (Drink, DEFAULT_DRINKS)):
+            self.dedupe(model, defaults, dry_run, batch_size)
+
+    def dedupe(self, model, defaults, dry_run, batch_size):
+        default_names = [item['name'] for item in defaults]
+        compared_fields = [name for name in defaults[0] if name != 'name']
+
+        # Oldest global item wins if a name exists more than once
+        globals_by_name = {}
+        for item in model.objects.filter(user=None, name__in=default_names).order_by('id'):
+            globals_by_name.setdefault(item.name, item)
+
+        copies = model.objects.filter(
+            user__isnull=False,
+            copied_from__isnull=True,
+            name__in=globals_by_name.keys()
+        ).only('id', 'user_id', 'name', *compared_fields).order_by('id')
+
+        # to_delete: copy id -> id of the global item replacing it
+        to_delete, to_link = {}, []
+        deleted = linked = 0
+        affected_users = set()
+        for item in copies.iterator(chunk_size=batch_size):
+            affected_users.add(item.user_id)
+            global_item = globals_by_name[item.name]
+            if all(getattr(item, field) == getattr(global_item, field) for field in compared_fields):
+                to_delete[item.pk] = global_item.pk
+            else:
+                item.copied_from_id = global_item.pk
+                to_link.append(item)
+
+            if len(to_delete) >= batch_size or len(to_link) >= batch_size:
+                deleted += self.flush(model, to_delete, to_link, dry_run)
+                linked += len(to_link)
+                to_delete, to_link = {}, []
+
+        deleted += self.flush(model, to_delete, to_link, dry_run)
+        linked += len(to_link)
+
+        if not dry_run:
+            # Bulk deletes and updates skip the post_save/post_delete hooks
+            for user_id in affected_users:
+                bump_catalog_version(model, user_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'[DRY RUN] ' if dry_run else ''}{model.__name__}: removed {deleted} unchanged copies, "
+            f"linked {linked} edited copies to their global item"
+        ))
+
+    def flush(self, model, to_delete, to_link, dry_run):
+        if dry_run:
+            return len(to_delete)
+        with transaction.atomic():
+            if to_delete:
+                # Keep logged meals on the identical global item instead of letting SET_NULL orphan them
+                field = model._meta.model_name
+                replacements = {}
+                for copy_id, global_id in to_delete.items():
+                    replacements.setdefault(global_id, []).append(copy_id)
+                for global_id, copy_ids in replacements.items():
+                    MealEntry.objects.filter(**{f'{field}__in': copy_ids}).update(**{field: global_id})
+                model.objects.filter(pk__in=to_delete).delete()
+            if to_link:
+                model.objects.bulk_update(to_link, ['copied_from'])
+        return len(to_delete)
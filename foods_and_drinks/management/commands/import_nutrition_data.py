@@ -0,0 +1,185 @@
+import csv
+import json
+import math
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from foods_and_drinks.models import Food, Drink
+from foods_and_drinks.caching import bump_catalog_version
+
+MODELS = {'food': Food, 'drink': Drink}
+
+# Imported columns besides external_id and name; all are optional floats
+NUMERIC_FIELDS = {
+    'food': [
+        'water_percentage', 'calories_per_gram', 'protein_per_gram', 'carbs_per_gram',
+        'fats_per_gram', 'sugar_per_gram', 'mass',
+    ],
+    'drink': [
+        'calories_per_ml', 'sugar_per_ml', 'protein_per_ml', 'carbs_per_ml',
+        'fats_per_ml', 'volume',
+    ],
+}
+
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Import global foods or drinks from a CSV or NDJSON file (one JSON object per line). '
+        'Rows are keyed by external_id: new ids are created, changed rows updated and '
+        'unchanged rows skipped, so re-running an import is cheap.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--model', choices=sorted(MODELS), required=True)
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ndjson'],
+            help='Input format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows validated and written per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and compare rows without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or self.guess_format(path)
+        self.model = MODELS[options['model']]
+        self.fields = ['name', *NUMERIC_FIELDS[options['model']]]
+        self.defaults = {name: self.model._meta.get_field(name).default for name in self.fields}
+        self.dry_run = options['dry_run']
+        self.counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'invalid': 0}
+        self.reported_errors = 0
+
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            rows = self.read_rows(stream, input_format)
+            line = 0
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                self.import_batch(batch, first_line=line + 1)
+                line += len(batch)
+                self.stdout.write(
+                    f"{line} rows: {self.counts['created']} created, {self.counts['updated']} updated, "
+                    f"{self.counts['unchanged']} unchanged, {self.counts['invalid']} invalid"
+                )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if not self.dry_run and (self.counts['created'] or self.counts['updated']):
+            # bulk_create skips the post_save hooks that normally bump it
+            bump_catalog_version(self.model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import finished: {self.counts['created']} created, {self.counts['updated']} updated, "
+            f"{self.counts['unchanged']} unchanged, {self.counts['invalid']} invalid"
+        ))
+
+    def guess_format(self, path):
+        if path.endswith('.csv'):
+            return 'csv'
+        if path.endswith(('.ndjson', '.jsonl')):
+            return 'ndjson'
+        raise CommandError('Cannot tell the input format from the file name, pass --format')
+
+    def read_rows(self, stream, input_format):
+        """Yield raw rows (dicts, or the error for an unparseable line) one at a time"""
+        if input_format == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for text in stream:
+            if not text.strip():
+                continue
+            try:
+                yield json.loads(text)
+            except ValueError as e:
+                yield e
+
+    def clean_row(self, row):
+        """Validated field values for a row, keyed like the model; raises ValueError"""
+        if not isinstance(row, dict):
+            raise ValueError(f'not a JSON object ({row})')
+
+        external_id = str(row.get('external_id') or '').strip()
+        name = str(row.get('name') or '').strip()
+        if not external_id:
+            raise ValueError('external_id is required')
+        if len(external_id) > 64:
+            raise ValueError('external_id is longer than 64 characters')
+        if not name:
+            raise ValueError('name is required')
+        if len(name) > 100:
+            raise ValueError('name is longer than 100 characters')
+
+        values = {'external_id': external_id, 'name': name}
+        for field in self.fields[1:]:
+            raw = row.get(field)
+            if raw is None or raw == '':
+                values[field] = self.defaults[field]
+                continue
+            value = float(raw)
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f'{field} must be a non-negative number')
+            values[field] = value
+        if 'water_percentage' in values and values['water_percentage'] > 100:
+            raise ValueError('water_percentage must be at most 100')
+        return values
+
+    def import_batch(self, batch, first_line):
+        cleaned = {}
+        for offset, row in enumerate(batch):
+            try:
+                values = self.clean_row(row)
+            except (TypeError, ValueError) as e:
+                self.counts['invalid'] += 1
+                if self.reported_errors < MAX_REPORTED_ERRORS:
+                    self.reported_errors += 1
+                    self.stderr.write(f'Row {first_line + offset}: {e}')
+                continue
+            cleaned[values['external_id']] = values  # the last row wins within a batch
+
+        if not cleaned:
+            return
+
+        existing = {
+            row['external_id']: row
+            for row in self.model.objects.filter(external_id__in=cleaned.keys()).values('external_id', *self.fields)
+        }
+        changed = []
+        for external_id, values in cleaned.items():
+            current = existing.get(external_id)
+            if current is None:
+                self.counts['created'] += 1
+            elif current == values:
+                self.counts['unchanged'] += 1
+                continue
+            else:
+                self.counts['updated'] += 1
+            changed.append(self.model(user=None, **values))
+
+        if changed and not self.dry_run:
+            with transaction.atomic():
+                self.model.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=['external_id'],
+                    update_fields=self.fields,
+                )
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods_and_drinks', '0005_food_sugar_per_gram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drink',
+            name='copied_from',
+            field=models.ForeignKey(blank=True, help_text='Global item this user copy was made from (it replaces it for the user)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='user_copies', to='foods_and_drinks.drink'),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='copied_from',
+            field=models.ForeignKey(blank=True, help_text='Global item this user copy was made from (it replaces it for the user)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='user_copies', to='foods_and_drinks.food'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods_and_drinks', '0007_name_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drink',
+            name='external_id',
+            field=models.CharField(blank=True, help_text="Natural key of items loaded by import_nutrition_data (e.g. 'usda:171077')", max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='external_id',
+            field=models.CharField(blank=True, help_text="Natural key of items loaded by import_nutrition_data (e.g. 'usda:171077')", max_length=64, null=True, unique=True),
+        ),
+    ]
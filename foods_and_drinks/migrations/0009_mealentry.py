@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 10:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods_and_drinks', '0008_external_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.FloatField(help_text='Grams of food or ml of drink')),
+                ('kcal', models.PositiveIntegerField(default=0)),
+                ('protein', models.FloatField(default=0.0, help_text='grams')),
+                ('carbs', models.FloatField(default=0.0, help_text='grams')),
+                ('fats', models.FloatField(default=0.0, help_text='grams')),
+                ('sugar', models.FloatField(default=0.0, help_text='grams')),
+                ('water_intake', models.FloatField(default=0.0, help_text='Liters')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('drink', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='meal_entries', to='foods_and_drinks.drink')),
+                ('food', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='meal_entries', to='foods_and_drinks.food')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='meal_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'meal entries',
+                'ordering': ['date', 'id'],
+                'indexes': [models.Index(fields=['user', 'date'], name='meal_entry_user_date_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('food__isnull', True), ('drink__isnull', True), _connector='OR'), name='meal_entry_food_or_drink')],
+            },
+        ),
+    ]
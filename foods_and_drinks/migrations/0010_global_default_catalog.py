@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from foods_and_drinks.defaults import DEFAULT_DRINKS, DEFAULT_FOODS
+
+
+def create_global_defaults(apps, schema_editor):
+    """Load the shared default catalog once, so registration has nothing to provision"""
+    from foods_and_drinks.caching import bump_catalog_version
+
+    for model_name, defaults in (('Food', DEFAULT_FOODS), ('Drink', DEFAULT_DRINKS)):
+        model = apps.get_model('foods_and_drinks', model_name)
+        existing = set(model.objects.filter(user=None).values_list('name', flat=True))
+        missing = [model(user=None, **item) for item in defaults if item['name'] not in existing]
+        if missing:
+            model.objects.bulk_create(missing)
+            bump_catalog_version(model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods_and_drinks', '0009_mealentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_global_defaults, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+TABLES = ['foods_and_drinks_food', 'foods_and_drinks_drink']
+
+
+def create_prefix_index(apps, schema_editor):
+    """Index for the name__istartswith search fallback (PostgreSQL only; SQLite searches through FTS5)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        # Matches the UPPER(name::text) LIKE UPPER(...) Django emits for name__istartswith
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_name_upper_idx "
+            f"ON {table} ((UPPER(name::text)) text_pattern_ops)"
+        )
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_name_upper_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods_and_drinks', '0010_global_default_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
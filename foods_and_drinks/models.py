@@ -1,9 +1,21 @@
 # models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.contrib.auth import get_user_model
+from .nutrition import NUTRIENT_FIELDS, item_nutrients, apply_daily_deltas
 
 User = get_user_model()
 
+
+class CatalogQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Global items plus the user's own, hiding globals the user has customised"""
+        if not user.is_authenticated:
+            return self.filter(user=None)
+        customised = self.model.objects.filter(user_id=user.id, copied_from__isnull=False).values('copied_from')
+        return self.filter(Q(user_id=user.id) | Q(user=None)).exclude(id__in=customised)
+
+
 class Food(models.Model):
     user = models.ForeignKey(
         User,
@@ -13,7 +25,22 @@ class Food(models.Model):
         blank=True,
         help_text="Null means available to all users"
     )
+    copied_from = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        related_name='user_copies',
+        null=True,
+        blank=True,
+        help_text="Global item this user copy was made from (it replaces it for the user)"
+    )
     name = models.CharField(max_length=100)
+    external_id = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Natural key of items loaded by import_nutrition_data (e.g. 'usda:171077')"
+    )
     water_percentage = models.FloatField(default=0.0, help_text="Percentage of water content in the food")
 
     # Macronutrients per gram
@@ -25,6 +52,8 @@ class Food(models.Model):
 
     mass = models.FloatField(default=100.0, help_text="Reference mass in grams for display purposes")
 
+    objects = CatalogQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.user.email if self.user else 'Global'})"
 
@@ -59,7 +88,22 @@ class Drink(models.Model):
         blank=True,
         help_text="Null means available to all users"
     )
+    copied_from = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        related_name='user_copies',
+        null=True,
+        blank=True,
+        help_text="Global item this user copy was made from (it replaces it for the user)"
+    )
     name = models.CharField(max_length=100)
+    external_id = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Natural key of items loaded by import_nutrition_data (e.g. 'usda:171077')"
+    )
 
     # Nutrients per ml
     calories_per_ml = models.FloatField(default=0.0, help_text="Calories per milliliter")
@@ -70,6 +114,8 @@ class Drink(models.Model):
 
     volume = models.FloatField(default=250.0, help_text="Reference volume in ml for display purposes")
 
+    objects = CatalogQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.user.email if self.user else 'Global'})"
 
@@ -93,3 +139,71 @@ class Drink(models.Model):
     @property
     def fats_per_volume(self):
         return self.fats_per_ml * self.volume
+
+
+class MealEntry(models.Model):
+    """
+    A logged portion of a food (grams) or drink (ml) on a given day.
+
+    The nutrient fields are the entry's contribution to that day's
+    DailyWellness totals, computed on save from the catalog item. save()
+    and delete() add and remove them incrementally; bulk queryset
+    operations bypass this and leave the totals untouched.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='meal_entries')
+    date = models.DateField()
+    food = models.ForeignKey(Food, on_delete=models.SET_NULL, related_name='meal_entries', null=True, blank=True)
+    drink = models.ForeignKey(Drink, on_delete=models.SET_NULL, related_name='meal_entries', null=True, blank=True)
+    quantity = models.FloatField(help_text="Grams of food or ml of drink")
+
+    # Contribution snapshot
+    kcal = models.PositiveIntegerField(default=0)
+    protein = models.FloatField(default=0.0, help_text="grams")
+    carbs = models.FloatField(default=0.0, help_text="grams")
+    fats = models.FloatField(default=0.0, help_text="grams")
+    sugar = models.FloatField(default=0.0, help_text="grams")
+    water_intake = models.FloatField(default=0.0, help_text="Liters")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['date', 'id']
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(food__isnull=True) | Q(drink__isnull=True),
+                name='meal_entry_food_or_drink',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date'], name='meal_entry_user_date_idx'),
+        ]
+        verbose_name_plural = 'meal entries'
+
+    def __str__(self):
+        item = self.food or self.drink
+        return f"{self.quantity} of {item.name if item else 'deleted item'} on {self.date}"
+
+    def nutrients(self):
+        return {field: getattr(self, field) for field in NUTRIENT_FIELDS}
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            changes = []
+            if self.pk is not None:
+                previous = MealEntry.objects.select_for_update().filter(pk=self.pk).values('date', *NUTRIENT_FIELDS).first()
+                if previous is not None:
+                    changes.append((previous.pop('date'), previous, -1))
+            if self.food_id or self.drink_id:
+                # Without an item (deleted from the catalog) the old snapshot stands
+                for field, value in item_nutrients(self.food, self.drink, self.quantity).items():
+                    setattr(self, field, value)
+            super().save(*args, **kwargs)
+            changes.append((self.date, self.nutrients(), 1))
+            apply_daily_deltas(self.user_id, changes)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            stored = MealEntry.objects.select_for_update().filter(pk=self.pk).values('date', *NUTRIENT_FIELDS).first()
+            if stored is not None:
+                apply_daily_deltas(self.user_id, [(stored.pop('date'), stored, -1)])
+            return super().delete(*args, **kwargs)
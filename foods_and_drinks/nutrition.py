@@ -0,0 +1,203 @@
+"""
+Nutrient totals for logged meals and meal plans.
+
+A MealEntry stores what it contributed to its day (a snapshot taken when
+it was written), so keeping DailyWellness current is a matter of adding
+or subtracting that snapshot: each entry write touches one row per
+affected day, never the rest of the day's entries.
+
+Meal plans are evaluated in bulk: the referenced catalog items are packed
+into a NumPy matrix (one row per item, one column per nutrient) and all
+(item, quantity) pairs of all plans are summed in one vectorized pass,
+with the same per-entry kcal rounding as item_nutrients().
+"""
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+
+from auth_api.models import DailyWellness
+
+# MealEntry snapshot fields, named after the DailyWellness totals they feed
+NUTRIENT_FIELDS = ['kcal', 'protein', 'carbs', 'fats', 'sugar', 'water_intake']
+
+
+def item_nutrients(food=None, drink=None, quantity=0.0):
+    """Contribution of `quantity` grams of a food or ml of a drink (water in liters)"""
+    if food is not None:
+        return {
+            'kcal': max(0, round(food.calories_per_gram * quantity)),
+            'protein': food.protein_per_gram * quantity,
+            'carbs': food.carbs_per_gram * quantity,
+            'fats': food.fats_per_gram * quantity,
+            'sugar': food.sugar_per_gram * quantity,
+            'water_intake': quantity * food.water_percentage / 100 / 1000,
+        }
+    return {
+        'kcal': max(0, round(drink.calories_per_ml * quantity)),
+        'protein': drink.protein_per_ml * quantity,
+        'carbs': drink.carbs_per_ml * quantity,
+        'fats': drink.fats_per_ml * quantity,
+        'sugar': drink.sugar_per_ml * quantity,
+        'water_intake': quantity / 1000,
+    }
+
+
+def apply_daily_deltas(user_id, changes):
+    """
+    Add nutrient deltas to the user's DailyWellness rows.
+
+    `changes` is a list of (date, nutrients, sign) tuples; sign is 1 for an
+    entry being added and -1 for one being removed. Days without a record
+    get one with only the nutrient totals (time_slept stays empty), and such
+    a day is removed again once it holds nothing. Rows are locked and saved
+    through the model so the wellness signals keep the rollups and caches
+    current.
+    """
+    by_date = defaultdict(lambda: dict.fromkeys(NUTRIENT_FIELDS, 0))
+    for day, nutrients, sign in changes:
+        for field in NUTRIENT_FIELDS:
+            by_date[day][field] += sign * nutrients[field]
+
+    with transaction.atomic():
+        for day, delta in sorted(by_date.items()):
+            if not any(delta.values()):
+                continue
+            wellness, _ = DailyWellness.objects.select_for_update().get_or_create(
+                user_id=user_id, date=day,
+                defaults={field: 0 for field in NUTRIENT_FIELDS},
+            )
+            for field in NUTRIENT_FIELDS:
+                # Clamp at zero: the day may have been edited by hand since
+                setattr(wellness, field, max(0, getattr(wellness, field) + delta[field]))
+            if wellness.time_slept is None and not any(getattr(wellness, field) for field in NUTRIENT_FIELDS):
+                wellness.delete()
+            else:
+                wellness.save()
+
+
+MAX_PLANS = 1000
+MAX_PLAN_ITEMS = 100_000
+# Ids per IN (...) lookup, well under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Per-unit nutrient columns read for each catalog; water is derived below
+FOOD_COLUMNS = ['calories_per_gram', 'protein_per_gram', 'carbs_per_gram', 'fats_per_gram', 'sugar_per_gram', 'water_percentage']
+DRINK_COLUMNS = ['calories_per_ml', 'protein_per_ml', 'carbs_per_ml', 'fats_per_ml', 'sugar_per_ml']
+
+
+class NutrientTable:
+    """Nutrients per gram (foods) or per ml (drinks), in NUTRIENT_FIELDS order"""
+
+    def __init__(self, foods, drinks):
+        # foods/drinks: iterables of (id, *FOOD_COLUMNS) / (id, *DRINK_COLUMNS) rows
+        self.rows = {}
+        per_unit = []
+        for item_id, kcal, protein, carbs, fats, sugar, water_percentage in foods:
+            self.rows[('food', item_id)] = len(per_unit)
+            per_unit.append((kcal, protein, carbs, fats, sugar, water_percentage / 100 / 1000))
+        for item_id, kcal, protein, carbs, fats, sugar in drinks:
+            self.rows[('drink', item_id)] = len(per_unit)
+            per_unit.append((kcal, protein, carbs, fats, sugar, 1 / 1000))
+        self.matrix = np.array(per_unit, dtype=np.float64).reshape(-1, len(NUTRIENT_FIELDS))
+
+    @classmethod
+    def for_user(cls, user, food_ids, drink_ids):
+        """Table of the requested items visible to the user (one query per catalog and LOOKUP_BATCH_SIZE ids)"""
+        from .models import Food, Drink
+
+        def fetch(model, ids, columns):
+            ids = list(ids)
+            for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+                batch = ids[start:start + LOOKUP_BATCH_SIZE]
+                yield from model.objects.visible_to(user).filter(id__in=batch).values_list('id', *columns)
+
+        return cls(fetch(Food, food_ids, FOOD_COLUMNS), fetch(Drink, drink_ids, DRINK_COLUMNS))
+
+    def totals(self, plan_index, rows, quantities, plan_count):
+        """Per-plan totals: a (plan_count, len(NUTRIENT_FIELDS)) array"""
+        contributions = self.matrix[rows] * quantities[:, None]
+        contributions[:, 0] = np.maximum(np.rint(contributions[:, 0]), 0)  # kcal rounded per entry
+        totals = np.zeros((plan_count, len(NUTRIENT_FIELDS)))
+        np.add.at(totals, plan_index, contributions)
+        return totals
+
+
+def _parse_plans(plans):
+    """Flatten plans into (plan index, ('food'|'drink', id), quantity) triples; raises ValueError"""
+    if not isinstance(plans, list) or not plans:
+        raise ValueError('plans must be a non-empty list')
+    if len(plans) > MAX_PLANS:
+        raise ValueError(f'At most {MAX_PLANS} plans per request')
+
+    entries = []
+    for plan_number, plan in enumerate(plans):
+        items = plan.get('items') if isinstance(plan, dict) else None
+        if not isinstance(items, list):
+            raise ValueError(f'Plan {plan_number}: items must be a list')
+        for item in items:
+            if not isinstance(item, dict) or ('food' in item) == ('drink' in item):
+                raise ValueError(f'Plan {plan_number}: each item needs exactly one of food or drink')
+            kind = 'food' if 'food' in item else 'drink'
+            item_id, quantity = item[kind], item.get('quantity')
+            if not isinstance(item_id, int) or isinstance(item_id, bool):
+                raise ValueError(f'Plan {plan_number}: {kind} must be an id')
+            if not isinstance(quantity, (int, float)) or isinstance(quantity, bool) or not 0 < quantity < float('inf'):
+                raise ValueError(f'Plan {plan_number}: quantity must be a positive number')
+            entries.append((plan_number, (kind, item_id), float(quantity)))
+        if len(entries) > MAX_PLAN_ITEMS:
+            raise ValueError(f'At most {MAX_PLAN_ITEMS} items across all plans')
+    return entries
+
+
+def evaluate_meal_plans(user, plans, targets=None):
+    """
+    Nutrient totals of each plan, plus a score when targets are given.
+
+    The score is the sum over the targeted nutrients of the relative
+    distance to the target (0 is a perfect match, lower is better).
+    Raises ValueError for malformed plans or items the user cannot see.
+    """
+    entries = _parse_plans(plans)
+    if targets is None:
+        targets = {}
+    if not isinstance(targets, dict):
+        raise ValueError('targets must be an object of nutrient: target')
+    unknown_targets = set(targets) - set(NUTRIENT_FIELDS)
+    if unknown_targets:
+        raise ValueError(f"Unknown target(s): {', '.join(sorted(unknown_targets))}")
+    if any(
+        not isinstance(value, (int, float)) or isinstance(value, bool) or not 0 < value < float('inf')
+        for value in targets.values()
+    ):
+        raise ValueError('Targets must be positive numbers')
+
+    keys = {key for _, key, _ in entries}
+    table = NutrientTable.for_user(
+        user,
+        food_ids=[item_id for kind, item_id in keys if kind == 'food'],
+        drink_ids=[item_id for kind, item_id in keys if kind == 'drink'],
+    )
+    missing = keys - table.rows.keys()
+    if missing:
+        raise ValueError('Unknown ' + ', '.join(f'{kind} {item_id}' for kind, item_id in sorted(missing)))
+
+    plan_index = np.fromiter((plan for plan, _, _ in entries), dtype=np.intp, count=len(entries))
+    rows = np.fromiter((table.rows[key] for _, key, _ in entries), dtype=np.intp, count=len(entries))
+    quantities = np.fromiter((quantity for _, _, quantity in entries), dtype=np.float64, count=len(entries))
+    totals = table.totals(plan_index, rows, quantities, len(plans))
+
+    scores = None
+    if targets:
+        columns = [NUTRIENT_FIELDS.index(field) for field in targets]
+        wanted = np.array(list(targets.values()), dtype=np.float64)
+        scores = (np.abs(totals[:, columns] - wanted) / wanted).sum(axis=1)
+
+    results = []
+    for plan_number, row in enumerate(totals.tolist()):
+        result = dict(zip(NUTRIENT_FIELDS, row))
+        result['kcal'] = int(result['kcal'])
+        if scores is not None:
+            result['score'] = float(scores[plan_number])
+        results.append(result)
+    return results
@@ -0,0 +1,117 @@
+"""
+Name search over the food and drink catalogs.
+
+On SQLite the names are indexed by the FTS5 tables created in migration
+0007 (prefix indexes, unicode61 tokenizer, kept in sync by triggers), so
+every word of the query is matched as a case and accent insensitive
+prefix. Other databases fall back to a case insensitive prefix match on
+the whole name (name__istartswith). On PostgreSQL migration 0011 backs it
+with an UPPER(name) text_pattern_ops index; elsewhere it scans the
+visible items.
+
+The migrations carry their own frozen copy of the DDL. The trigger SQL
+here is for ensure_search_triggers and must create the same triggers as
+0007.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models.functions import Length
+
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SEARCH_TABLES = ['foods_and_drinks_food', 'foods_and_drinks_drink']
+
+
+def fts_trigger_sql(table):
+    """Triggers keeping a catalog's FTS table in sync, by trigger name"""
+    fts = f'{table}_fts'
+    return {
+        f'{fts}_ai': (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name); END"
+        ),
+        f'{fts}_ad': (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name); END"
+        ),
+        f'{fts}_au': (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name); "
+            f"INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name); END"
+        ),
+    }
+
+
+def ensure_search_triggers(using='default', **kwargs):
+    """
+    Restore the FTS sync triggers and reindex if they are missing.
+
+    SQLite migrations that alter a catalog table rebuild it, which drops its
+    triggers, so this runs after every migrate (post_migrate receiver).
+    """
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for table in SEARCH_TABLES:
+            fts = f'{table}_fts'
+            cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s", [f'{fts}%'])
+            existing = {row[0] for row in cursor.fetchall()}
+            if fts not in existing:
+                continue  # index not created yet (migration 0007 not applied)
+            triggers = fts_trigger_sql(table)
+            if triggers.keys() <= existing:
+                continue
+            for sql in triggers.values():
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def match_expression(query):
+    """FTS5 query matching every word of the input as a prefix, or None"""
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _fts_search(model, user, expression, limit):
+    # CROSS JOIN makes SQLite drive the lookup from the FTS matches rather
+    # than from every global row through the user_id index
+    table = model._meta.db_table
+    fts = f'{table}_fts'
+    if user.is_authenticated:
+        scope = (
+            f"(item.user_id = %s OR item.user_id IS NULL) AND item.id NOT IN ("
+            f"SELECT copied_from_id FROM {table} WHERE user_id = %s AND copied_from_id IS NOT NULL)"
+        )
+        params = [expression, user.id, user.id, limit]
+    else:
+        scope = "item.user_id IS NULL"
+        params = [expression, limit]
+    return model.objects.raw(
+        f"SELECT item.* FROM {fts} CROSS JOIN {table} AS item ON item.id = {fts}.rowid "
+        f"WHERE {fts} MATCH %s AND {scope} "
+        f"ORDER BY LENGTH(item.name), item.name, item.id LIMIT %s",
+        params,
+    )
+
+
+def search_catalog(model, user, query, limit=SEARCH_DEFAULT_LIMIT):
+    """Top matches among the items visible to the user, shortest names first"""
+    if connection.vendor == 'sqlite':
+        expression = match_expression(query)
+        if expression is None:
+            return model.objects.none()
+        return _fts_search(model, user, expression, limit)
+
+    query = query.strip()
+    if not query:
+        return model.objects.none()
+    return model.objects.visible_to(user).filter(
+        name__istartswith=query
+    ).order_by(Length('name'), 'name', 'id')[:limit]
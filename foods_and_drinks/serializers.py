@@ -1,7 +1,29 @@
 from rest_framework import serializers
-from .models import Food, Drink
+from .models import Food, Drink, MealEntry
 
-class FoodSerializer(serializers.ModelSerializer):
+
+def requested_fields(request, serializer_class):
+    """Field names picked with ?fields=id,name, or None for all fields"""
+    if request is None or not request.query_params.get('fields'):
+        return None
+    names = [name.strip() for name in request.query_params['fields'].split(',') if name.strip()]
+    unknown = set(names) - set(serializer_class.Meta.fields)
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown field(s): {', '.join(sorted(unknown))}"})
+    return names
+
+
+class SparseFieldsetMixin:
+    """Limit the serialized fields to those requested with ?fields="""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = requested_fields(self.context.get('request'), type(self))
+        if names is not None:
+            for name in set(self.fields) - set(names):
+                self.fields.pop(name)
+
+class FoodSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # Computed properties
     calories_per_mass = serializers.ReadOnlyField()
     protein_per_mass = serializers.ReadOnlyField()
@@ -39,15 +61,16 @@ class FoodSerializer(serializers.ModelSerializer):
         ]
 
     def get_is_global(self, obj):
-        return obj.user is None
+        return obj.user_id is None
 
     def get_is_editable(self, obj):
+        # Compare ids so listing never loads the owning user per row
         request = self.context.get('request')
-        if request and request.user:
-            return obj.user == request.user
+        if request and request.user.is_authenticated:
+            return obj.user_id == request.user.id
         return False
 
-class DrinkSerializer(serializers.ModelSerializer):
+class DrinkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # Computed volume-based nutrients
     calories_per_volume = serializers.ReadOnlyField()
     sugar_per_volume = serializers.ReadOnlyField()
@@ -86,10 +109,40 @@ class DrinkSerializer(serializers.ModelSerializer):
         ]
 
     def get_is_global(self, obj):
-        return obj.user is None
+        return obj.user_id is None
 
     def get_is_editable(self, obj):
+        # Compare ids so listing never loads the owning user per row
         request = self.context.get('request')
-        if request and request.user:
-            return obj.user == request.user
+        if request and request.user.is_authenticated:
+            return obj.user_id == request.user.id
         return False
+
+
+class MealEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MealEntry
+        fields = [
+            'id', 'date', 'food', 'drink', 'quantity',
+
+            # Contribution to the day's totals
+            'kcal', 'protein', 'carbs', 'fats', 'sugar', 'water_intake',
+        ]
+        read_only_fields = ['kcal', 'protein', 'carbs', 'fats', 'sugar', 'water_intake']
+
+    def validate_quantity(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('Quantity must be positive')
+        return value
+
+    def validate(self, attrs):
+        food = attrs['food'] if 'food' in attrs else getattr(self.instance, 'food', None)
+        drink = attrs['drink'] if 'drink' in attrs else getattr(self.instance, 'drink', None)
+        if (food is None) == (drink is None):
+            raise serializers.ValidationError('Provide exactly one of food or drink')
+
+        item = food or drink
+        request = self.context.get('request')
+        if item.user_id is not None and item.user_id != request.user.id:
+            raise serializers.ValidationError('Unknown food or drink')
+        return attrs
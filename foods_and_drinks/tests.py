@@ -1,3 +1,363 @@
+from datetime import date
+import importlib
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from auth_api.models import CustomUser, DailyWellness
+
+from . import caching
+from .defaults import DEFAULT_FOODS
+from .models import Drink, Food, MealEntry
+from .search import SEARCH_TABLES, fts_trigger_sql
+
+
+class EmptyCatalogTestCase(TestCase):
+    """Starts without the default global items loaded by migration 0010"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Food.objects.filter(user=None).delete()
+        Drink.objects.filter(user=None).delete()
+
+
+class FoodListQueryCountTests(EmptyCatalogTestCase):
+    ITEM_COUNT = 1000
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = CustomUser.objects.create_user(
+            username='eater', email='eater@example.com', password='pw',
+            first_name='Eater', last_name='Test'
+        )
+        Food.objects.bulk_create(
+            [Food(user=None, name=f'Global {i}', calories_per_gram=1.5) for i in range(10)]
+            + [Food(user=cls.user, name=f'Own {i}', calories_per_gram=2.0) for i in range(cls.ITEM_COUNT)]
+        )
+
+    def setUp(self):
+        cache.clear()
+        caching._global_catalog.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_catalog_list_query_count_is_constant(self):
+        # Global catalog (cold in-process cache) plus the user's own rows
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/foods-and-drinks/foods/?paginate=false')
+
+        self.assertEqual(len(response.json()), self.ITEM_COUNT + 10)
+
+    def test_catalog_list_is_paginated_by_default(self):
+        first = self.client.get('/api/foods-and-drinks/foods/').json()
+        second = self.client.get(first['next']).json()
+
+        self.assertEqual(len(first['results']), 100)
+        self.assertEqual(first['results'][0]['name'], 'Global 0')
+        self.assertGreater(second['results'][0]['id'], first['results'][-1]['id'])
+
+    def test_user_foods_list_query_count_is_constant(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/foods-and-drinks/user-foods/')
+
+        self.assertEqual(len(response.json()), self.ITEM_COUNT + 10)
+
+    def test_ownership_flags(self):
+        rows = self.client.get('/api/foods-and-drinks/foods/?paginate=false').json()
+        own = [row for row in rows if row['name'].startswith('Own')]
+        shared = [row for row in rows if row['name'].startswith('Global')]
+
+        self.assertTrue(all(row['is_editable'] and not row['is_global'] for row in own))
+        self.assertTrue(all(row['is_global'] and not row['is_editable'] for row in shared))
+
+    def test_etag_depends_on_the_requested_projection(self):
+        projected = self.client.get('/api/foods-and-drinks/foods/?fields=name,id')
+        reordered = self.client.get('/api/foods-and-drinks/foods/?fields=id,name', HTTP_IF_NONE_MATCH=projected['ETag'])
+        full = self.client.get('/api/foods-and-drinks/foods/', HTTP_IF_NONE_MATCH=projected['ETag'])
+
+        self.assertEqual(reordered.status_code, 304)
+        self.assertEqual(full.status_code, 200)
+        self.assertNotEqual(full['ETag'], projected['ETag'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The FTS5 search index only exists on SQLite')
+class FoodSearchTests(EmptyCatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = CustomUser.objects.create_user(
+            username='searcher', email='searcher@example.com', password='pw',
+            first_name='Search', last_name='Test'
+        )
+        cls.other = CustomUser.objects.create_user(
+            username='other', email='other@example.com', password='pw',
+            first_name='Other', last_name='Test'
+        )
+        cls.global_food = Food.objects.create(user=None, name='Chicken Breast')
+        Food.objects.create(user=cls.user, name='Crème brûlée')
+        Food.objects.create(user=cls.other, name='Chicken Soup')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, query):
+        response = self.client.get('/api/foods-and-drinks/foods/search/', {'q': query, 'fields': 'name'})
+        return [row['name'] for row in response.json()]
+
+    def test_trigger_repair_matches_the_migration(self):
+        migration = importlib.import_module('foods_and_drinks.migrations.0007_name_search_index')
+
+        class RecordingEditor:
+            executed = []
+
+            def execute(self, sql):
+                self.executed.append(sql)
+        RecordingEditor.connection = connection
+        migration.create_search_index(None, RecordingEditor())
+
+        migrated = [sql for sql in RecordingEditor.executed if sql.startswith('CREATE TRIGGER')]
+        repaired = [
+            sql.replace('IF NOT EXISTS ', '')
+            for table in SEARCH_TABLES for sql in fts_trigger_sql(table).values()
+        ]
+        self.assertEqual(migrated, repaired)
+
+    def test_prefix_case_and_accent_insensitive(self):
+        self.assertEqual(self.search('chick'), ['Chicken Breast'])
+        self.assertEqual(self.search('CREME BRU'), ['Crème brûlée'])
+        self.assertEqual(self.search('"'), [])
+
+    def test_index_follows_writes_and_hides_forks(self):
+        Food.objects.create(user=self.user, name='My Chicken', copied_from=self.global_food)
+        self.assertEqual(self.search('chicken'), ['My Chicken'])
+
+        Food.objects.filter(user=self.user, name='My Chicken').delete()
+        self.global_food.name = 'Turkey Breast'
+        self.global_food.save()
+        self.assertEqual(self.search('chicken'), [])
+        self.assertEqual(self.search('turk'), ['Turkey Breast'])
+
+
+class MealPlanEvaluateTests(EmptyCatalogTestCase):
+    URL = '/api/foods-and-drinks/meal-plans/evaluate/'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = CustomUser.objects.create_user(
+            username='planner', email='planner@example.com', password='pw',
+            first_name='Plan', last_name='Test'
+        )
+        Food.objects.bulk_create([Food(user=None, name=f'Item {i}', calories_per_gram=1.0) for i in range(1200)])
+        cls.food_ids = list(Food.objects.values_list('id', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def evaluate(self, targets=None):
+        plans = [{'items': [{'food': food_id, 'quantity': 2} for food_id in self.food_ids]}]
+        return self.client.post(self.URL, {'plans': plans, 'targets': targets}, format='json')
+
+    def test_many_distinct_items_are_looked_up_in_batches(self):
+        response = self.evaluate()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['kcal'], 2400)
+
+    def test_malformed_targets_are_rejected(self):
+        self.assertEqual(self.evaluate(targets=[2000]).status_code, 400)
+        self.assertEqual(self.evaluate(targets={'kcal': True}).status_code, 400)
+        self.assertEqual(self.evaluate(targets={'kcal': 2400}).json()['results'][0]['score'], 0)
+
+
+
+class MealEntryTests(EmptyCatalogTestCase):
+    URL = '/api/foods-and-drinks/meal-entries/'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = CustomUser.objects.create_user(
+            username='logger', email='logger@example.com', password='pw',
+            first_name='Meal', last_name='Test'
+        )
+        cls.rice = Food.objects.create(
+            user=None, name='Rice', calories_per_gram=1.3, protein_per_gram=0.027,
+            carbs_per_gram=0.28, fats_per_gram=0.003, water_percentage=70
+        )
+        cls.juice = Drink.objects.create(user=None, name='Juice', calories_per_ml=0.45, sugar_per_ml=0.09)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def day(self, value='2025-05-01'):
+        return DailyWellness.objects.filter(user=self.user, date=value).first()
+
+    def assertDayTotals(self, value, kcal, water_intake, **totals):
+        day = self.day(value)
+        self.assertEqual(day.kcal, kcal)
+        self.assertAlmostEqual(day.water_intake, water_intake)
+        for field, expected in totals.items():
+            self.assertAlmostEqual(getattr(day, field), expected)
+
+    def test_create_adds_food_and_drink_to_the_day(self):
+        self.client.post(self.URL, {'date': '2025-05-01', 'food': self.rice.id, 'quantity': 200}, format='json')
+        response = self.client.post(self.URL, {'date': '2025-05-01', 'drink': self.juice.id, 'quantity': 500}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['water_intake'], 0.5)  # drink volume in liters
+        # Water: 70% of 200 g of rice plus 500 ml of juice
+        self.assertDayTotals('2025-05-01', kcal=260 + 225, water_intake=0.14 + 0.5, protein=5.4, sugar=45)
+
+    def test_quantity_update_replaces_the_contribution(self):
+        entry = self.client.post(self.URL, {'date': '2025-05-01', 'food': self.rice.id, 'quantity': 200}, format='json').json()
+
+        self.client.patch(f"{self.URL}{entry['id']}/", {'quantity': 100}, format='json')
+
+        self.assertDayTotals('2025-05-01', kcal=130, water_intake=0.07, protein=2.7, carbs=28)
+
+    def test_date_move_shifts_the_contribution(self):
+        self.client.post(self.URL, {'date': '2025-05-01', 'drink': self.juice.id, 'quantity': 500}, format='json')
+        entry = self.client.post(self.URL, {'date': '2025-05-01', 'food': self.rice.id, 'quantity': 200}, format='json').json()
+
+        self.client.patch(f"{self.URL}{entry['id']}/", {'date': '2025-05-02'}, format='json')
+
+        self.assertDayTotals('2025-05-01', kcal=225, water_intake=0.5, protein=0)
+        self.assertDayTotals('2025-05-02', kcal=260, water_intake=0.14, protein=5.4)
+
+    def test_delete_subtracts_the_contribution(self):
+        self.client.post(self.URL, {'date': '2025-05-01', 'drink': self.juice.id, 'quantity': 500}, format='json')
+        entry = self.client.post(self.URL, {'date': '2025-05-01', 'food': self.rice.id, 'quantity': 200}, format='json').json()
+
+        response = self.client.delete(f"{self.URL}{entry['id']}/")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertDayTotals('2025-05-01', kcal=225, water_intake=0.5, protein=0, sugar=45)
+
+    def test_day_entry_after_meal_fills_in_the_started_day(self):
+        self.client.post(self.URL, {'date': '2025-05-01', 'food': self.rice.id, 'quantity': 200}, format='json')
+        self.assertIsNone(self.day().time_slept)
+
+        response = self.client.post('/api/wellness/', {
+            'date': '2025-05-01', 'kcal': 2100, 'protein': 90, 'carbs': 250, 'fats': 70,
+            'sugar': 30, 'time_slept': 7.5, 'water_intake': 2.0,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(DailyWellness.objects.filter(user=self.user).count(), 1)
+        self.assertEqual((self.day().kcal, self.day().time_slept), (2100, 7.5))
+
+    def test_meal_only_day_is_not_recorded_sleep(self):
+        DailyWellness.objects.create(
+            user=self.user, date='2025-04-30', kcal=2000, protein=80, carbs=200, fats=60,
+            time_slept=8, water_intake=2.0
+        )
+        self.client.post(self.URL, {'date': '2025-05-01', 'drink': self.juice.id, 'quantity': 500}, format='json')
+
+        summary = self.client.get('/api/dashboard/summary/').json()['summary']
+        self.assertEqual(summary['total_days_recorded'], 2)
+        self.assertEqual(summary['averages']['time_slept'], 8.0)
+
+    def test_removing_the_only_meal_removes_the_started_day(self):
+        entry = self.client.post(self.URL, {'date': '2025-05-01', 'food': self.rice.id, 'quantity': 200}, format='json').json()
+
+        self.client.delete(f"{self.URL}{entry['id']}/")
+
+        self.assertIsNone(self.day())
+
+
+class DedupeDefaultCatalogTests(TestCase):
+    def test_meal_entries_follow_deleted_copies_to_the_global_item(self):
+        user = CustomUser.objects.create_user(
+            username='deduped', email='deduped@example.com', password='pw',
+            first_name='Dedupe', last_name='Test'
+        )
+        copy = Food.objects.create(user=user, **DEFAULT_FOODS[0])
+        entry = MealEntry.objects.create(user=user, date=date(2025, 1, 1), food=copy, quantity=100)
+
+        call_command('dedupe_default_catalog', stdout=StringIO())
+
+        entry.refresh_from_db()
+        self.assertFalse(Food.objects.filter(pk=copy.pk).exists())
+        self.assertEqual(entry.food, Food.objects.get(user=None, name=copy.name))
+
+
+
+class ImportNutritionDataTests(TestCase):
+    CSV = (
+        "external_id,name,calories_per_gram,protein_per_gram,water_percentage\n"
+        "usda:1,Oats,3.89,0.169,8\n"
+        "usda:2,Lentils,1.16,0.09,69\n"
+        ",No id,1,1,1\n"
+        "usda:3,Bad water,1,1,150\n"
+    )
+    NDJSON_ROWS = [
+        {'external_id': 'ndb:1', 'name': 'Orange juice', 'calories_per_ml': 0.45, 'sugar_per_ml': 0.084},
+        {'external_id': 'ndb:2', 'name': 'Milk', 'calories_per_ml': 0.42, 'volume': 200},
+    ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, model, *args):
+        out = StringIO()
+        call_command('import_nutrition_data', path, '--model', model, *args, stdout=out, stderr=StringIO())
+        return out.getvalue().strip().splitlines()[-1]
+
+    def test_csv_import_is_idempotent(self):
+        path = self.write('foods.csv', self.CSV)
+
+        first = self.run_import(path, 'food')
+        second = self.run_import(path, 'food')
+
+        self.assertEqual(first, 'Import finished: 2 created, 0 updated, 0 unchanged, 2 invalid')
+        self.assertEqual(second, 'Import finished: 0 created, 0 updated, 2 unchanged, 2 invalid')
+        oats = Food.objects.get(external_id='usda:1')
+        self.assertEqual((oats.user, oats.name, oats.calories_per_gram, oats.mass), (None, 'Oats', 3.89, 100.0))
+
+    def test_changed_value_is_updated(self):
+        self.run_import(self.write('foods.csv', self.CSV), 'food')
+
+        changed = self.write('changed.csv', self.CSV.replace('Lentils,1.16', 'Lentils,1.2'))
+        summary = self.run_import(changed, 'food')
+
+        self.assertEqual(summary, 'Import finished: 0 created, 1 updated, 1 unchanged, 2 invalid')
+        self.assertEqual(Food.objects.get(external_id='usda:2').calories_per_gram, 1.2)
+
+    def test_ndjson_import_skips_invalid_lines(self):
+        lines = [json.dumps(row) for row in self.NDJSON_ROWS] + ['{not json', '["a list"]']
+        path = self.write('drinks.ndjson', '\n'.join(lines) + '\n')
+
+        summary = self.run_import(path, 'drink')
+
+        self.assertEqual(summary, 'Import finished: 2 created, 0 updated, 0 unchanged, 2 invalid')
+        self.assertEqual(Drink.objects.get(external_id='ndb:2').volume, 200)
+        self.assertEqual(Drink.objects.get(external_id='ndb:1').volume, 250.0)  # model default
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write('foods.csv', self.CSV)
+
+        summary = self.run_import(path, 'food', '--dry-run')
 
-# Create your tests here.
+        self.assertEqual(summary, 'Import finished: 2 created, 0 updated, 0 unchanged, 2 invalid')
+        self.assertFalse(Food.objects.filter(external_id__isnull=False).exists())
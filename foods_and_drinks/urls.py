@@ -1,19 +1,30 @@
-from django.urls import path
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
 from . import views
 
+router = DefaultRouter()
+router.register(r'meal-entries', views.MealEntryViewSet, basename='meal-entries')
+
 urlpatterns = [
+    path('', include(router.urls)),
+
     # Food URLs
     path('foods/', views.FoodListAPIView.as_view(), name='food-list'),
+    path('foods/search/', views.FoodSearchAPIView.as_view(), name='food-search'),
     path('foods/create/', views.FoodCreateAPIView.as_view(), name='food-create'),
     path('foods/<int:pk>/', views.FoodDetailAPIView.as_view(), name='food-detail'),
     path('foods/<int:pk>/delete/', views.FoodDeleteAPIView.as_view(), name='food-delete'),
     
     # Drink URLs
     path('drinks/', views.DrinkListAPIView.as_view(), name='drink-list'),
+    path('drinks/search/', views.DrinkSearchAPIView.as_view(), name='drink-search'),
     path('drinks/create/', views.DrinkCreateAPIView.as_view(), name='drink-create'),
     path('drinks/<int:pk>/', views.DrinkDetailAPIView.as_view(), name='drink-detail'),
     path('drinks/<int:pk>/delete/', views.DrinkDeleteAPIView.as_view(), name='drink-delete'),
     
+    # Meal plans
+    path('meal-plans/evaluate/', views.MealPlanEvaluateAPIView.as_view(), name='meal-plan-evaluate'),
+
     # Optional: Combined endpoints
     path('user-foods/', views.UserFoodsAPIView.as_view(), name='user-foods'),
     path('user-drinks/', views.UserDrinksAPIView.as_view(), name='user-drinks'),
@@ -1,9 +1,18 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, viewsets
 from rest_framework.response import Response
 from rest_framework import status
 from django.db.models import Q
-from .models import Food, Drink
-from .serializers import FoodSerializer, DrinkSerializer
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from auth_api.authentication import TokenUserAuthMixin
+from .models import Food, Drink, MealEntry
+from .serializers import FoodSerializer, DrinkSerializer, MealEntrySerializer, requested_fields
+from .pagination import CatalogCursorPagination
+from .search import search_catalog, SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT
+from .nutrition import evaluate_meal_plans
+from .caching import catalog_etag, get_global_catalog
+
+CATALOG_LIST_PARAMS = ('fields', 'cursor', 'page_size', 'paginate')
 
 
 class UserSpecificMixin:
@@ -11,42 +20,10 @@ class UserSpecificMixin:
     permission_classes = [permissions.AllowAny]  # For testing - change back to IsAuthenticated later
     
     def get_queryset(self):
-        """Return items - if user not authenticated, return empty queryset for now"""
-        print(f"🔍 DEBUG: User authenticated: {self.request.user.is_authenticated}")
-        print(f"🔍 DEBUG: User: {self.request.user}")
-        
-        # TEMPORARY: For testing, return all items regardless of authentication
-        # TODO: Remove this and uncomment the authentication check below
-        if hasattr(self, 'model'):
-            if self.model == Food:
-                queryset = Food.objects.all()
-                print(f"🍽️ Food queryset count (ALL): {queryset.count()}")
-                return queryset
-            elif self.model == Drink:
-                queryset = Drink.objects.all()
-                print(f"🥤 Drink queryset count (ALL): {queryset.count()}")
-                return queryset
-        
-        # UNCOMMENT THIS BLOCK WHEN AUTHENTICATION IS WORKING:
-        # if not self.request.user.is_authenticated:
-        #     print("❌ User not authenticated, returning empty queryset")
-        #     if hasattr(self, 'model'):
-        #         return self.model.objects.none()
-        #     return super().get_queryset().none()
-        
-        # If user is authenticated, return user's items + global items
-        print(f"✅ User authenticated: {self.request.user.id}")
-        
-        if hasattr(self, 'model'):
-            if self.model == Food:
-                queryset = Food.objects.filter(Q(user=self.request.user) | Q(user=None))
-                print(f"🍽️ Food queryset count: {queryset.count()}")
-                return queryset
-            elif self.model == Drink:
-                queryset = Drink.objects.filter(Q(user=self.request.user) | Q(user=None))
-                print(f"🥤 Drink queryset count: {queryset.count()}")
-                return queryset
-        
+        """Return the shared global items plus the user's own (anonymous users only see global items)"""
+        if hasattr(self, 'model') and self.model in (Food, Drink):
+            return self.model.objects.visible_to(self.request.user)
+
         return super().get_queryset()
     
     def perform_create(self, serializer):
@@ -56,9 +33,78 @@ class UserSpecificMixin:
         else:
             # For testing purposes - save as global item
             serializer.save(user=None)
+
+
+class GlobalCatalogListMixin:
+    """
+    List views: pages of the visible items, keyset-paginated on id.
+
+    With ?paginate=false the whole list is returned instead: the global
+    items come from the in-process catalog cache, the user's own items
+    from one small query, merged in id order.
+    ?fields= picks the returned fields on both paths.
+    """
+    pagination_class = CatalogCursorPagination
+
+    @property
+    def paginator(self):
+        """Cursor pagination unless the client explicitly opts out with ?paginate=false"""
+        if self.request.query_params.get('paginate') == 'false':
+            return None
+        return super().paginator
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+
+        fields = requested_fields(request, self.serializer_class)
+        global_rows = get_global_catalog(self.model, self.serializer_class)
+        own_items = []
+        if request.user.is_authenticated:
+            own_items = list(self.model.objects.filter(user_id=request.user.id))
+            replaced = {item.copied_from_id for item in own_items if item.copied_from_id}
+            global_rows = [row for row in global_rows if row['id'] not in replaced]
+
+        # Pair rows with their id so the order holds even when ?fields= drops it
+        rows = [
+            (row['id'], row if fields is None else {name: row[name] for name in fields})
+            for row in global_rows
+        ]
+        own_rows = self.get_serializer(own_items, many=True).data
+        rows.extend(zip((item.id for item in own_items), own_rows))
+        rows.sort(key=lambda pair: pair[0])
+        return Response([row for _, row in rows])
+
+
+class CopyOnWriteMixin:
+    """
+    Detail views: global items can be read and edited, but an edit never
+    touches the shared row. It is saved as the user's own copy, which then
+    replaces the global item for that user. Deletion is limited to own items.
+    """
+
+    def get_queryset(self):
+        if not self.request.user.is_authenticated:
+            return self.model.objects.none()
+        if self.request.method == 'DELETE':
+            return self.model.objects.filter(user=self.request.user)
+        return self.model.objects.visible_to(self.request.user)
+
+    def perform_update(self, serializer):
+        item = serializer.instance
+        if item.user_id is None:
+            # Turn the instance into an unsaved copy so save() inserts a new row
+            global_item_id = item.pk
+            item.pk = None
+            item._state.adding = True
+            item.user = self.request.user
+            item.copied_from_id = global_item_id
+            item.external_id = None  # the natural key stays with the imported row
+        serializer.save()
             
 # FOOD VIEWS
-class FoodListAPIView(UserSpecificMixin, generics.ListAPIView):
+@method_decorator(condition(etag_func=catalog_etag(Food, CATALOG_LIST_PARAMS)), name='get')
+class FoodListAPIView(TokenUserAuthMixin, GlobalCatalogListMixin, UserSpecificMixin, generics.ListAPIView):
     """List all foods available to the current user (their own + global)"""
     model = Food
     serializer_class = FoodSerializer
@@ -68,16 +114,10 @@ class FoodCreateAPIView(UserSpecificMixin, generics.CreateAPIView):
     model = Food
     serializer_class = FoodSerializer
 
-class FoodDetailAPIView(UserSpecificMixin, generics.RetrieveUpdateDestroyAPIView):
-    """Retrieve, update, or delete a food item (only user's own items)"""
+class FoodDetailAPIView(CopyOnWriteMixin, UserSpecificMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Retrieve or update a food item (edits to global items create a user copy), or delete an own item"""
     model = Food
     serializer_class = FoodSerializer
-    
-    def get_queryset(self):
-        """Only allow access to user's own items for modification/deletion"""
-        if not self.request.user.is_authenticated:
-            return Food.objects.none()
-        return Food.objects.filter(user=self.request.user)
 
 class FoodDeleteAPIView(UserSpecificMixin, generics.DestroyAPIView):
     """Delete a food item (only user's own items)"""
@@ -91,7 +131,8 @@ class FoodDeleteAPIView(UserSpecificMixin, generics.DestroyAPIView):
         return Food.objects.filter(user=self.request.user)
 
 # DRINK VIEWS
-class DrinkListAPIView(UserSpecificMixin, generics.ListAPIView):
+@method_decorator(condition(etag_func=catalog_etag(Drink, CATALOG_LIST_PARAMS)), name='get')
+class DrinkListAPIView(TokenUserAuthMixin, GlobalCatalogListMixin, UserSpecificMixin, generics.ListAPIView):
     """List all drinks available to the current user (their own + global)"""
     model = Drink
     serializer_class = DrinkSerializer
@@ -101,16 +142,10 @@ class DrinkCreateAPIView(UserSpecificMixin, generics.CreateAPIView):
     model = Drink
     serializer_class = DrinkSerializer
 
-class DrinkDetailAPIView(UserSpecificMixin, generics.RetrieveUpdateDestroyAPIView):
-    """Retrieve, update, or delete a drink item (only user's own items)"""
+class DrinkDetailAPIView(CopyOnWriteMixin, UserSpecificMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Retrieve or update a drink item (edits to global items create a user copy), or delete an own item"""
     model = Drink
     serializer_class = DrinkSerializer
-    
-    def get_queryset(self):
-        """Only allow access to user's own items for modification/deletion"""
-        if not self.request.user.is_authenticated:
-            return Drink.objects.none()
-        return Drink.objects.filter(user=self.request.user)
 
 class DrinkDeleteAPIView(UserSpecificMixin, generics.DestroyAPIView):
     """Delete a drink item (only user's own items)"""
@@ -124,6 +159,33 @@ class DrinkDeleteAPIView(UserSpecificMixin, generics.DestroyAPIView):
         return Drink.objects.filter(user=self.request.user)
 
 # Optional: Combined views for better API organization
+class CatalogSearchMixin:
+    """Autocomplete: ?q=<words>&limit=<n> over the names of the visible items"""
+
+    def list(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'limit': 'Must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+        results = search_catalog(self.model, request.user, query, limit)
+        return Response(self.get_serializer(results, many=True).data)
+
+
+class FoodSearchAPIView(TokenUserAuthMixin, CatalogSearchMixin, UserSpecificMixin, generics.ListAPIView):
+    """Search foods by name"""
+    model = Food
+    serializer_class = FoodSerializer
+
+
+class DrinkSearchAPIView(TokenUserAuthMixin, CatalogSearchMixin, UserSpecificMixin, generics.ListAPIView):
+    """Search drinks by name"""
+    model = Drink
+    serializer_class = DrinkSerializer
+
+
 class UserFoodsAPIView(UserSpecificMixin, generics.ListCreateAPIView):
     """List user's foods and create new ones"""
     model = Food
@@ -132,4 +194,45 @@ class UserFoodsAPIView(UserSpecificMixin, generics.ListCreateAPIView):
 class UserDrinksAPIView(UserSpecificMixin, generics.ListCreateAPIView):
     """List user's drinks and create new ones"""
     model = Drink
-    serializer_class = DrinkSerializer
\ No newline at end of file
+    serializer_class = DrinkSerializer
+
+# MEAL LOGGING
+class MealEntryViewSet(TokenUserAuthMixin, viewsets.ModelViewSet):
+    """Log foods and drinks; each write updates the day's DailyWellness totals"""
+    serializer_class = MealEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = MealEntry.objects.filter(user_id=self.request.user.id)
+        date_param = self.request.query_params.get('date')
+        if date_param:
+            queryset = queryset.filter(date=date_param)
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class MealPlanEvaluateAPIView(generics.GenericAPIView):
+    """
+    Score candidate meal plans in one request.
+
+    POST {"plans": [{"items": [{"food": 3, "quantity": 150}, {"drink": 1, "quantity": 330}]}],
+          "targets": {"kcal": 2000, "protein": 120}}
+    returns the nutrient totals of each plan (and a score when targets are given),
+    plus the index of the best plan.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response({'error': 'Expected an object with a plans list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            results = evaluate_meal_plans(request.user, request.data.get('plans'), request.data.get('targets'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = {'results': results}
+        if results and 'score' in results[0]:
+            response['best'] = min(range(len(results)), key=lambda index: results[index]['score'])
+        return Response(response)
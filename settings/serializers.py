@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from django.contrib.auth import password_validation
 from auth_api.models import CustomUser
+from auth_api.passwords import change_password, PasswordChangeError
 
 class UserProfileSerializer(serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
@@ -66,7 +67,11 @@ class PasswordChangeSerializer(serializers.Serializer):
         return data
 
     def save(self, user):
-        if not user.check_password(self.validated_data['current_password']):
-            raise serializers.ValidationError({'current_password': 'Incorrect password.'})
-        user.set_password(self.validated_data['new_password'])
-        user.save()
+        try:
+            change_password(
+                user, self.validated_data['new_password'],
+                current_password=self.validated_data['current_password']
+            )
+        except PasswordChangeError as e:
+            field = 'current_password' if e.code == PasswordChangeError.INCORRECT_CURRENT else 'new_password'
+            raise serializers.ValidationError({field: e.message})
@@ -1,3 +1,76 @@
+import csv
+import io
+import json
+from datetime import date
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from auth_api.models import CustomUser, DailyWellness, DataRetentionLog, PasswordHistory
+from foods_and_drinks.models import Drink, Food
+
+
+class ExportUserDataTests(TestCase):
+    RECORD_TYPES = ['profile', 'daily_wellness', 'food', 'drink', 'password_change', 'retention_log']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='exporter', email='exporter@example.com', password='Export-pass-1',
+            first_name='Ex', last_name='Porter'
+        )
+        DailyWellness.objects.create(
+            user=cls.user, date=date(2025, 3, 1), kcal=1800, protein=90, carbs=200,
+            fats=60, sugar=25, time_slept=7.0, water_intake=1.5
+        )
+        Food.objects.create(user=cls.user, name='Overnight Oats')
+        Drink.objects.create(user=cls.user, name='Green Tea')
+        cls.old_password = PasswordHistory.objects.create(user=cls.user, password=cls.user.password)
+        DataRetentionLog.objects.create(user=cls.user, action='warning_sent',
+                                        details='30 days left', days_inactive=700)
+
+        other = CustomUser.objects.create_user(
+            username='bystander', email='bystander@example.com', password='pw',
+            first_name='By', last_name='Stander'
+        )
+        Food.objects.create(user=other, name='Not Mine')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, export_format):
+        response = self.client.get('/api/settings/export/', {'export_format': export_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_streams_every_table(self):
+        content = self.export('ndjson')
+        records = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual([record['type'] for record in records], self.RECORD_TYPES)
+        self.assertEqual(records[0]['data']['username'], 'exporter')
+        self.assertEqual(records[2]['data']['name'], 'Overnight Oats')
+        self.assertEqual(set(records[4]['data']), {'created_at'})
+        self.assertNotIn('Not Mine', content)
+        self.assertNotIn(self.user.password, content)
+
+    def test_csv_streams_every_table_as_sections(self):
+        content = self.export('csv')
+        rows = list(csv.reader(io.StringIO(content)))
+
+        headers = [row for row in rows if row[0] == 'record_type']
+        records = [row for row in rows if row[0] != 'record_type']
+        self.assertEqual([row[0] for row in records], self.RECORD_TYPES)
+        self.assertEqual(len(headers), len(self.RECORD_TYPES))
+        self.assertIn('username', headers[0])
+        self.assertIn('kcal', headers[1])
+        self.assertEqual(headers[4], ['record_type', 'created_at'])
+        self.assertEqual(headers[5], ['record_type', 'action', 'timestamp', 'details', 'days_inactive'])
+        self.assertNotIn('Not Mine', content)
+        self.assertNotIn(self.user.password, content)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get('/api/settings/export/', {'export_format': 'xml'})
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 400)
@@ -17,7 +17,7 @@ class ProfileView(APIView):
         return Response(serializer.data)
 
 from auth_api.models import PasswordHistory
-from django.contrib.auth.hashers import check_password
+from auth_api.passwords import change_password, PasswordChangeError
 
 class UpdateUserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -33,26 +33,14 @@ class UpdateUserView(APIView):
             new = serializer.validated_data['new_password']
             confirm = serializer.validated_data['confirm_password']
 
-            if not request.user.check_password(current):
-                return Response({'current_password': ['Incorrect current password.']}, status=status.HTTP_400_BAD_REQUEST)
-
             if new != confirm:
                 return Response({'confirm_password': ['Passwords do not match.']}, status=status.HTTP_400_BAD_REQUEST)
 
-            if check_password(new, request.user.password):
-                return Response({'new_password': ['New password cannot be the same as the old password.']},
-                                status=status.HTTP_400_BAD_REQUEST)
-
-            # Optional: Check against password history
-            previous = PasswordHistory.objects.filter(user=request.user).values_list('password', flat=True)
-            for old in previous:
-                if check_password(new, old):
-                    return Response({'new_password': ['You cannot reuse a previously used password.']},
-                                    status=status.HTTP_400_BAD_REQUEST)
-
-            request.user.set_password(new)
-            request.user.save()
-            PasswordHistory.objects.create(user=request.user, password=request.user.password)
+            try:
+                change_password(request.user, new, current_password=current)
+            except PasswordChangeError as e:
+                field = 'current_password' if e.code == PasswordChangeError.INCORRECT_CURRENT else 'new_password'
+                return Response({field: [e.message]}, status=status.HTTP_400_BAD_REQUEST)
 
             return Response(UserProfileSerializer(request.user).data)
 
@@ -70,9 +58,87 @@ class DeleteAccountView(APIView):
         return Response({"detail": "Account deleted."}, status=204)
 
 
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from auth_api.models import DailyWellness, DataRetentionLog
+from foods_and_drinks.models import Food, Drink
+
+
+class _EchoBuffer:
+    """File-like object whose write() hands the row back to the csv writer's caller"""
+    def write(self, value):
+        return value
+
+
 class ExportUserDataView(APIView):
+    """
+    Export the user's data.
+    Without parameters the profile is returned as JSON. With
+    ?export_format=ndjson or ?export_format=csv the profile and then the full
+    history are streamed table by table, reading rows with server-side iterators so memory stays
+    flat however much history the user has.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
+    CHUNK_SIZE = 2000
+    EXPORT_FORMATS = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+
     def get(self, request):
-        profile = UserProfileSerializer(request.user).data
-        return JsonResponse(profile, safe=False)
+        export_format = request.query_params.get('export_format')
+        if not export_format:
+            profile = UserProfileSerializer(request.user).data
+            return JsonResponse(profile, safe=False)
+
+        if export_format not in self.EXPORT_FORMATS:
+            return Response({'error': 'export_format must be one of: ndjson, csv'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        rows = self._ndjson_rows if export_format == 'ndjson' else self._csv_rows
+        response = StreamingHttpResponse(rows(request.user), content_type=self.EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="wellness-export-{request.user.id}.{export_format}"'
+        return response
+
+    def _tables(self, user):
+        """(record type, field names, queryset) of every exported table"""
+        wellness_fields = [
+            field.name for field in DailyWellness._meta.concrete_fields if field.name not in ('id', 'user')
+        ]
+        food_fields = [field.name for field in Food._meta.concrete_fields if field.name not in ('id', 'user')]
+        drink_fields = [field.name for field in Drink._meta.concrete_fields if field.name not in ('id', 'user')]
+        return [
+            ('daily_wellness', wellness_fields, DailyWellness.objects.filter(user=user).order_by('date')),
+            ('food', food_fields, Food.objects.filter(user=user).order_by('id')),
+            ('drink', drink_fields, Drink.objects.filter(user=user).order_by('id')),
+            # Only metadata: password hashes never leave the server
+            ('password_change', ['created_at'], PasswordHistory.objects.filter(user=user).order_by('created_at')),
+            ('retention_log', ['action', 'timestamp', 'details', 'days_inactive'],
+             DataRetentionLog.objects.filter(user=user).order_by('timestamp')),
+        ]
+
+    def _iter_rows(self, queryset, fields):
+        return queryset.values_list(*fields).iterator(chunk_size=self.CHUNK_SIZE)
+
+    def _ndjson_rows(self, user):
+        profile = UserProfileSerializer(user).data
+        yield json.dumps({'type': 'profile', 'data': profile}, cls=DjangoJSONEncoder) + '\n'
+        for record_type, fields, queryset in self._tables(user):
+            for values in self._iter_rows(queryset, fields):
+                record = {'type': record_type, 'data': dict(zip(fields, values))}
+                yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+    def _csv_rows(self, user):
+        # Each table is a section starting with its own header row,
+        # beginning with the one-row profile section
+        writer = csv.writer(_EchoBuffer())
+        profile = UserProfileSerializer(user).data
+        yield writer.writerow(['record_type', *profile.keys()])
+        yield writer.writerow(['profile', *profile.values()])
+        for record_type, fields, queryset in self._tables(user):
+            yield writer.writerow(['record_type', *fields])
+            for values in self._iter_rows(queryset, fields):
+                yield writer.writerow([record_type, *values])
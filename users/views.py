@@ -3,6 +3,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import get_user_model, authenticate
+from auth_api.passwords import change_password, PasswordChangeError
 
 User = get_user_model()
 
@@ -13,11 +14,14 @@ def reset_password(request):
     current_password = request.data.get('current_password')
     new_password = request.data.get('new_password')
 
-    if not user.check_password(current_password):
-        return Response({'message': 'Current password is incorrect'}, status=status.HTTP_400_BAD_REQUEST)
+    if not current_password or not new_password:
+        return Response({'message': 'Current and new password are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        change_password(user, new_password, current_password=current_password)
+    except PasswordChangeError as e:
+        return Response({'message': e.message}, status=status.HTTP_400_BAD_REQUEST)
 
-    user.set_password(new_password)
-    user.save()
     return Response({'message': 'Password updated successfully'}, status=status.HTTP_200_OK)
 
 
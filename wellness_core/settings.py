@@ -72,6 +72,7 @@ SIMPLE_JWT = {
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'auth_api.middleware.QueryDebugMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'corsheaders.middleware.CorsMiddleware',  
@@ -84,7 +85,7 @@ MIDDLEWARE = [
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # if using JWT
+        'auth_api.authentication.CachedJWTAuthentication',  # JWT, with the optional per-process user cache
         'rest_framework.authentication.SessionAuthentication',  # if using sessions/cookies
     ),
    
@@ -129,6 +130,31 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
+# JWT fast paths (auth_api.authentication). JWT_USER_CACHE_TTL keeps token
+# users in a per-process cache for that many seconds (0 = query every time);
+# JWT_TOKEN_USER_MODE lets read-only requests on opted-in views authenticate
+# from the access token claims without touching the users table.
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', '0'))
+JWT_TOKEN_USER_MODE = os.environ.get('JWT_TOKEN_USER_MODE', '') == '1'
+
+# Password hashing. Hashes made with another iteration count are re-hashed on
+# the next successful login; see `manage.py benchmark_password_hashers` for
+# a value matching a latency target on the deployment hardware.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', '1000000'))
+
+PASSWORD_HASHERS = [
+    'auth_api.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Password reuse checks compare against this many previous passwords (older
+# history is pruned), hashing them in a pool of PASSWORD_CHECK_WORKERS threads
+PASSWORD_HISTORY_DEPTH = 5
+PASSWORD_CHECK_WORKERS = 4
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -184,6 +210,20 @@ DATABASES = {
     }
 }
 
+# Cache (dashboard responses, wellness data bounds)
+# Local memory by default; set REDIS_URL to share the cache between workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
 # Logging configuration (optional but helpful for debugging)
 LOGGING = {
     'version': 1,
@@ -211,6 +251,16 @@ LOGGING = {
     },
 }
 
+# Per-request SQL instrumentation (auth_api.middleware.QueryDebugMiddleware).
+# Requests sending the header are logged when ALLOW_HEADER is on; SAMPLE_RATE
+# logs that fraction of all requests. With both off the middleware is skipped.
+QUERY_DEBUG = {
+    'ALLOW_HEADER': DEBUG,
+    'HEADER': 'X-Debug-Queries',
+    'SAMPLE_RATE': float(os.environ.get('QUERY_DEBUG_SAMPLE_RATE', '0')),
+    'SLOW_QUERY_MS': 100,
+}
+
 # Data retention settings
 DATA_RETENTION_SETTINGS = {
     'INACTIVE_WARNING_DAYS': 150,  # 5 months